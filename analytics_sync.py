@@ -0,0 +1,168 @@
+"""
+Copie locale (SQLite) des tables cotations, lots et polices pour le
+reporting, alimentée de façon incrémentale.
+
+Chaque exécution ne lit que les lignes modifiées depuis le dernier
+filigrane (updated_at, id), par pages, et les applique en upsert. Une
+fenêtre de recouvrement rattrape les transactions validées en retard
+(updated_at = début de transaction) ; les upserts étant idempotents,
+relire quelques lignes est sans effet.
+
+Usage :
+    python analytics_sync.py [--db analytics.db] [--loop 300]
+"""
+import argparse
+import datetime
+import sqlite3
+import time
+
+from cotation_history import apply_keyset
+
+PAGE_SIZE = 1000
+OVERLAP = datetime.timedelta(minutes=2)
+
+# Colonnes répliquées par table (id en premier)
+TABLES = {
+    "cotations": [
+        "id", "created_at", "updated_at", "assure", "souscripteur", "beneficiaire",
+        "adresse_beneficiaire", "adresse", "situation_geo", "num_marche", "autorite",
+        "date_depot", "objet", "couverture", "detail_agrement", "montant_marche", "duree",
+        "montant_caution", "prime_nette", "frais_analyse", "accessoires", "taxes",
+        "prime_ttc", "date_cotation", "suretes_text", "statut",
+    ],
+    "lots": ["id", "cotation_id", "updated_at", "rang", "lot_num", "montant", "designation"],
+    "polices": [
+        "id", "cotation_id", "created_at", "updated_at", "police_num", "date_emission",
+        "date_effet", "date_echeance", "echeance", "duree_police",
+    ],
+}
+
+LOCAL_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_cotations_assure ON cotations (assure)",
+    "CREATE INDEX IF NOT EXISTS idx_cotations_couverture ON cotations (couverture)",
+    "CREATE INDEX IF NOT EXISTS idx_lots_cotation_id ON lots (cotation_id)",
+    "CREATE INDEX IF NOT EXISTS idx_polices_cotation_id ON polices (cotation_id)",
+    "CREATE INDEX IF NOT EXISTS idx_polices_echeance ON polices (echeance)",
+]
+
+
+def connect(path="analytics.db"):
+    """Ouvre (et crée au besoin) la base analytique locale."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for table, columns in TABLES.items():
+        cols = ", ".join(f"{c} PRIMARY KEY" if c == "id" else c for c in columns)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+        # Colonnes ajoutées depuis la création de la copie locale
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column in columns:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+    for ddl in LOCAL_INDEXES:
+        conn.execute(ddl)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            table_name TEXT PRIMARY KEY,
+            watermark_updated_at TEXT,
+            watermark_id,
+            started_at TEXT,
+            finished_at TEXT,
+            rows_applied INTEGER
+        )
+    """)
+    conn.commit()
+    return conn
+
+
+def _upsert_sql(table, columns):
+    placeholders = ", ".join("?" for _ in columns)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "id")
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}")
+
+
+def sync_table(client, conn, table):
+    """Synchronise une table ; retourne le nombre de lignes appliquées."""
+    columns = TABLES[table]
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    state = conn.execute("SELECT watermark_updated_at, watermark_id FROM sync_state "
+                         "WHERE table_name = ?", (table,)).fetchone()
+
+    cursor = None
+    if state and state[0]:
+        depart = datetime.datetime.fromisoformat(state[0]) - OVERLAP
+        cursor = (depart.isoformat(), 0)
+
+    sql = _upsert_sql(table, columns)
+    applied = 0
+    while True:
+        query = client.table(table).select(", ".join(columns))
+        query = apply_keyset(query, cursor, column="updated_at", desc=False)
+        rows = query.order('updated_at').order('id').limit(PAGE_SIZE).execute().data or []
+        if not rows:
+            break
+        with conn:
+            conn.executemany(sql, [tuple(row.get(c) for c in columns) for row in rows])
+            cursor = (rows[-1]["updated_at"], rows[-1]["id"])
+            conn.execute("""
+                INSERT INTO sync_state (table_name, watermark_updated_at, watermark_id)
+                VALUES (?, ?, ?)
+                ON CONFLICT (table_name) DO UPDATE SET
+                    watermark_updated_at = excluded.watermark_updated_at,
+                    watermark_id = excluded.watermark_id
+            """, (table, cursor[0], cursor[1]))
+        applied += len(rows)
+        if len(rows) < PAGE_SIZE:
+            break
+
+    with conn:
+        conn.execute("""
+            INSERT INTO sync_state (table_name, started_at, finished_at, rows_applied)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (table_name) DO UPDATE SET
+                started_at = excluded.started_at,
+                finished_at = excluded.finished_at,
+                rows_applied = excluded.rows_applied
+        """, (table, started_at.isoformat(),
+              datetime.datetime.now(datetime.timezone.utc).isoformat(), applied))
+    return applied
+
+
+def sync_all(client, conn):
+    """Synchronise les trois tables ; retourne {table: lignes appliquées}."""
+    return {table: sync_table(client, conn, table) for table in TABLES}
+
+
+def sync_lag(conn):
+    """
+    Retard de la copie locale, en secondes, par table : toute modification
+    antérieure au début de la dernière synchronisation réussie y figure.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return {table: (now - datetime.datetime.fromisoformat(started)).total_seconds()
+            for table, started in conn.execute(
+                "SELECT table_name, started_at FROM sync_state WHERE started_at IS NOT NULL")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synchronisation incrémentale vers la base analytique locale")
+    parser.add_argument("--db", default="analytics.db", help="Fichier SQLite local")
+    parser.add_argument("--loop", type=int, default=0,
+                        help="Relancer toutes les N secondes (0 = une seule exécution)")
+    args = parser.parse_args()
+
+    from supabase_client import create_supabase_client
+    client = create_supabase_client()
+    conn = connect(args.db)
+    while True:
+        t0 = time.perf_counter()
+        counts = sync_all(client, conn)
+        detail = ", ".join(f"{table}: {n}" for table, n in counts.items())
+        print(f"Synchronisation terminée en {time.perf_counter() - t0:.2f} s ({detail})")
+        if not args.loop:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    main()
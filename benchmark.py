@@ -0,0 +1,674 @@
+"""
+Mesures de performance de la génération documentaire, sur des données
+d'exemple (aucun accès base).
+
+Usage :
+    python benchmark.py pdf [--runs 5] [--debit-mbits 2]
+    python benchmark.py lettres [--exhaustif 2000000]
+    python benchmark.py formatage
+    python benchmark.py polices
+    python benchmark.py lots [--lots 20000] [--latence-ms 80]
+    python benchmark.py verification [--polices 200000]
+    python benchmark.py file [--workers N]
+    python benchmark.py signature [--documents 40] [--workers N]
+    python benchmark.py dossier [--runs 5]
+"""
+import argparse
+import datetime
+import statistics
+import time
+
+from formatting import format_date_fr
+
+SAMPLE_DATA = {
+    "assure": "SOCIÉTÉ IVOIRIENNE DE TRAVAUX PUBLICS",
+    "souscripteur": "SOCIÉTÉ IVOIRIENNE DE TRAVAUX PUBLICS",
+    "beneficiaire": "MINISTÈRE DE L'ÉQUIPEMENT ET DE L'ENTRETIEN ROUTIER",
+    "adresse": "Abidjan Plateau, 01 BP 1234 Abidjan 01",
+    "adresse_beneficiaire": "Abidjan Plateau, Cité administrative",
+    "situation_geo": "Yamoussoukro",
+    "num_marche": "2026-0-10-0-01/T/47",
+    "autorite": "AGEROUTE",
+    "date_depot": "15 octobre 2026",
+    "objet": "Travaux de réhabilitation de la route Yamoussoukro – Bouaflé",
+    "couverture": "Bonne exécution",
+    "montant_marche": 1_250_000_000,
+    "duree": "12 mois",
+    "montant_caution": 62_500_000,
+    "prime_nette": 625_000,
+    "accessoires": 15_000,
+    "frais_analyse": 50_000,
+    "taxes": 92_800,
+    "prime_ttc": 782_800,
+    "suretes_text": "Néant",
+    "date_cotation": format_date_fr(datetime.date(2026, 10, 19)),
+    "police_num": "3240-80012345625",
+    "date_emission": format_date_fr(datetime.date(2026, 10, 19)),
+    "date_effet": format_date_fr(datetime.date(2026, 10, 19)),
+    "date_echeance": format_date_fr(datetime.date(2027, 10, 18)),
+    "duree_police": "365 jours",
+}
+SAMPLE_LOTS = [
+    {"Lot": "1", "Montant": 25_000_000, "Désignation": "Terrassements et chaussée"},
+    {"Lot": "2", "Montant": 22_500_000, "Désignation": "Ouvrages d'art"},
+    {"Lot": "3", "Montant": 15_000_000, "Désignation": "Signalisation et équipements"},
+]
+
+
+def timed(func, runs):
+    """(dernier résultat, médiane des durées en secondes)."""
+    durations = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - t0)
+    return result, statistics.median(durations)
+
+
+# ============================
+# PDF : TAILLE ET PREMIÈRE PAGE
+# ============================
+def bench_pdf(args):
+    from reportlab import rl_config
+    from pdf_documents import generate_caution_pdf, generate_contrat_pdf
+    from pdf_optimize import first_page_bytes, optimize_pdf
+
+    def sortie_initiale(generate):
+        # Sortie d'origine : flux encodés en ASCII85 (défaut reportlab)
+        rl_config.useA85 = 1
+        try:
+            return generate()
+        finally:
+            rl_config.useA85 = 0
+
+    debit = args.debit_mbits * 1_000_000 / 8
+    documents = {
+        "Cotation": lambda: generate_caution_pdf(SAMPLE_DATA, SAMPLE_LOTS).getvalue(),
+        "Contrat": lambda: generate_contrat_pdf(SAMPLE_DATA, SAMPLE_LOTS).getvalue(),
+    }
+    print(f"Débit simulé : {args.debit_mbits} Mbit/s – médiane sur {args.runs} exécutions")
+    print(f"{'Document':<10} {'Sortie':<10} {'Taille':>9} {'Rendu':>9} {'1re page':>10} {'Affichage p.1':>14}")
+    for nom, generate in documents.items():
+        initiale, t_initial = timed(lambda: sortie_initiale(generate), args.runs)
+        pdf, t_rendu = timed(generate, args.runs)
+        optimise, t_optim = timed(lambda: optimize_pdf(pdf), args.runs)
+        for sortie, octets, duree in (("initiale", initiale, t_initial),
+                                      ("optimisée", optimise, t_rendu + t_optim)):
+            premiere = first_page_bytes(octets)
+            affichage = duree + premiere / debit
+            print(f"{nom:<10} {sortie:<10} {len(octets) / 1024:>7.0f} Ko {duree * 1000:>6.0f} ms "
+                  f"{premiere / 1024:>7.0f} Ko {affichage * 1000:>11.0f} ms")
+
+
+# ============================
+# MONTANTS EN LETTRES
+# ============================
+def _ancien_number_to_words(num):
+    """Version précédente (récursive, entiers seulement), pour comparaison."""
+    if num == 0:
+        return "zéro"
+    units = ["", "un", "deux", "trois", "quatre", "cinq", "six", "sept", "huit", "neuf"]
+    teens = ["dix", "onze", "douze", "treize", "quatorze", "quinze", "seize",
+             "dix-sept", "dix-huit", "dix-neuf"]
+    tens = ["", "", "vingt", "trente", "quarante", "cinquante", "soixante",
+            "soixante-dix", "quatre-vingt", "quatre-vingt-dix"]
+    thousands = ["", "mille", "million", "milliard"]
+
+    def below_1000(n):
+        if n < 10:
+            return units[n]
+        if n < 20:
+            return teens[n - 10]
+        if n < 100:
+            t, u = n // 10, n % 10
+            if u == 0:
+                return tens[t]
+            if t in (7, 9):
+                return tens[t - 1] + "-et-" + units[u] if u == 1 else tens[t - 1] + "-" + units[u]
+            return tens[t] + ("-" if u else "") + units[u]
+        h, r = n // 100, n % 100
+        if r == 0:
+            return units[h] + " cent"
+        return units[h] + " cent " + below_1000(r)
+
+    res, i = [], 0
+    while num:
+        chunk = num % 1000
+        if chunk:
+            word = below_1000(chunk)
+            if i == 1:
+                word += " " + thousands[i]
+            elif i >= 2:
+                word += " " + thousands[i] + ("s" if chunk > 1 else "")
+            res.append(word)
+        num //= 1000
+        i += 1
+    return " ".join(reversed(res)).capitalize()
+
+
+_VALEURS = {mot: n for n, mot in enumerate(
+    ["zéro", "un", "deux", "trois", "quatre", "cinq", "six", "sept", "huit", "neuf", "dix",
+     "onze", "douze", "treize", "quatorze", "quinze", "seize"])}
+_VALEURS.update({"vingt": 20, "trente": 30, "quarante": 40, "cinquante": 50, "soixante": 60,
+                 "quatrevingt": 80, "quatrevingts": 80})
+
+
+def _relire(mots):
+    """Relecture indépendante des lettres en nombre (contrôle aller-retour)."""
+    from formatting import _ECHELLES
+
+    echelles = {e: 1000 ** i for i, e in enumerate(_ECHELLES) if e}
+    mots = mots.lower().replace("quatre-vingt", "quatrevingt").replace("-", " ").split()
+    total = courant = 0
+    for mot in mots:
+        if mot == "et":
+            continue
+        if mot in _VALEURS:
+            courant += _VALEURS[mot]
+        elif mot in ("cent", "cents"):
+            courant = (courant or 1) * 100
+        elif mot.rstrip("s") in echelles:
+            total += (courant or 1) * echelles[mot.rstrip("s")]
+            courant = 0
+        else:
+            raise ValueError(f"Mot inattendu : {mot}")
+    return total + courant
+
+
+# Formes de référence (orthographe traditionnelle)
+_ATTENDUS = {
+    21: "Vingt et un", 71: "Soixante et onze", 72: "Soixante-douze", 80: "Quatre-vingts",
+    81: "Quatre-vingt-un", 91: "Quatre-vingt-onze", 100: "Cent", 200: "Deux cents",
+    201: "Deux cent un", 1000: "Mille", 80_000: "Quatre-vingt mille", 200_000: "Deux cent mille",
+    21_000_000: "Vingt et un millions", 80_000_000: "Quatre-vingts millions",
+    200_000_000: "Deux cents millions", 10 ** 12: "Un billion",
+}
+
+
+def bench_lettres(args):
+    import random
+    from formatting import MAX_NUMBER_TO_WORDS, amounts_to_words, number_to_words, numbers_to_words
+
+    # Contrôle : formes de référence, puis aller-retour exhaustif et aléatoire
+    erreurs = [n for n, attendu in _ATTENDUS.items() if number_to_words(n) != attendu]
+    t0 = time.perf_counter()
+    for n in range(args.exhaustif + 1):
+        if _relire(number_to_words(n)) != n:
+            erreurs.append(n)
+    rng = random.Random(1)
+    echantillon = [rng.randint(0, MAX_NUMBER_TO_WORDS) for _ in range(100_000)]
+    erreurs += [n for n in echantillon if _relire(number_to_words(n)) != n]
+    unitaires = [number_to_words(n) for n in echantillon]
+    erreurs += [n for n, a, b in zip(echantillon, unitaires, numbers_to_words(echantillon)) if a != b]
+    print(f"Contrôle : 0 à {args.exhaustif:,} + 100 000 tirages jusqu'à 10^24 "
+          f"en {time.perf_counter() - t0:.1f} s – {len(erreurs)} erreur(s) {erreurs[:10]}")
+
+    # Débit : montants quelconques, puis montants ronds (cas courant des cautions)
+    series = {
+        "quelconques": [rng.randrange(1_000_000, 5_000_000_000) for _ in range(100_000)],
+        "ronds": [rng.randrange(10, 50_000) * 100_000 for _ in range(100_000)],
+    }
+    for serie, montants in series.items():
+        print(f"Montants {serie} :")
+        for libelle, func in (("Ancienne version", lambda: [_ancien_number_to_words(m) for m in montants]),
+                              ("Table 0–999", lambda: [number_to_words(m) for m in montants]),
+                              ("Série (numbers_to_words)", lambda: numbers_to_words(montants)),
+                              ("Série avec devise", lambda: amounts_to_words(montants))):
+            _, duree = timed(func, args.runs)
+            print(f"  {libelle:<26} {len(montants) / duree:>12,.0f} montants/s")
+
+
+# ============================
+# FORMATAGE (MONTANTS, DATES)
+# ============================
+def bench_formatage(args):
+    import random
+    import threading
+    from formatting import fmt_money, format_date_fr
+
+    def ancien_fmt_money(val):
+        try:
+            val = float(val)
+            return f"{int(round(val)):,}".replace(",", " ") + " F CFA"
+        except:
+            return "0 F CFA"
+
+    def ancien_format_date_fr(date_obj):
+        mois = ["janvier", "février", "mars", "avril", "mai", "juin",
+                "juillet", "août", "septembre", "octobre", "novembre", "décembre"]
+        return f"{date_obj.day} {mois[date_obj.month - 1]} {date_obj.year}"
+
+    rng = random.Random(1)
+    montants = [rng.randrange(0, 5_000_000_000) for _ in range(200_000)]
+    dates = [datetime.date(2020, 1, 1) + datetime.timedelta(days=rng.randrange(3650)) for _ in range(200_000)]
+    for libelle, func, valeurs in (("fmt_money (ancien)", ancien_fmt_money, montants),
+                                   ("fmt_money", fmt_money, montants),
+                                   ("format_date_fr (ancien)", ancien_format_date_fr, dates),
+                                   ("format_date_fr", format_date_fr, dates)):
+        _, duree = timed(lambda: [func(v) for v in valeurs], args.runs)
+        print(f"{libelle:<24} {len(valeurs) / duree:>12,.0f} appels/s")
+
+    # Appels concurrents : résultats identiques à l'exécution séquentielle
+    attendu = [format_date_fr(d) + fmt_money(m) for d, m in zip(dates, montants)]
+    ecarts = []
+
+    def worker():
+        if [format_date_fr(d) + fmt_money(m) for d, m in zip(dates, montants)] != attendu:
+            ecarts.append(threading.current_thread().name)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(f"8 fils concurrents : {'résultats identiques' if not ecarts else f'écarts dans {ecarts}'}")
+
+
+# ============================
+# POLICES : TTF SOUS-ENSEMBLE CONTRE HELVETICA
+# ============================
+def bench_polices(args):
+    import pdf_documents
+    from fonts import register_fonts
+
+    police, police_grasse = register_fonts()
+    variantes = {
+        "Helvetica (base)": ("Helvetica", "Helvetica-Bold"),
+        f"{police} (sous-ensemble)": (police, police_grasse),
+    }
+    generateurs = {
+        "Cotation": lambda: pdf_documents.generate_caution_pdf(SAMPLE_DATA, SAMPLE_LOTS).getvalue(),
+        "Contrat": lambda: pdf_documents.generate_contrat_pdf(SAMPLE_DATA, SAMPLE_LOTS).getvalue(),
+    }
+    print(f"{'Document':<10} {'Police':<28} {'Taille':>9} {'Rendu':>9}")
+    try:
+        for document, generate in generateurs.items():
+            for libelle, (normale, grasse) in variantes.items():
+                pdf_documents.FONT, pdf_documents.FONT_BOLD = normale, grasse
+                generate()      # premier rendu hors mesure (sous-ensembles en cache)
+                pdf, duree = timed(generate, args.runs)
+                print(f"{document:<10} {libelle:<28} {len(pdf) / 1024:>7.0f} Ko {duree * 1000:>6.0f} ms")
+    finally:
+        pdf_documents.FONT, pdf_documents.FONT_BOLD = police, police_grasse
+
+
+# ============================
+# INSERTION DES LOTS : PAQUETS CONCURRENTS
+# ============================
+class _ServeurSimule:
+    """
+    Table lots simulée : latence par requête proportionnelle à la charge,
+    échecs aléatoires (dont une partie après application côté serveur,
+    comme une coupure réseau avant la réponse), unicité (cotation_id, rang).
+    """
+
+    def __init__(self, latence_s, octets_par_s, taux_echec, graine=1):
+        import random
+        import threading
+
+        self.latence_s, self.octets_par_s, self.taux_echec = latence_s, octets_par_s, taux_echec
+        self.rng = random.Random(graine)
+        self.lock = threading.Lock()
+        self.lignes = {}
+        self.requetes = self.echecs = 0
+
+    def table(self, nom):
+        return self
+
+    def upsert(self, lignes, on_conflict=None, ignore_duplicates=False):
+        return _RequeteSimulee(self, lignes)
+
+    def appliquer(self, lignes):
+        import json
+
+        time.sleep(self.latence_s + len(json.dumps(lignes, default=str)) / self.octets_par_s)
+        with self.lock:
+            self.requetes += 1
+            tirage = self.rng.random()
+        if tirage < self.taux_echec / 2:
+            with self.lock:
+                self.echecs += 1
+            raise ConnectionError("connexion interrompue")
+        with self.lock:
+            for ligne in lignes:
+                self.lignes.setdefault((ligne["cotation_id"], ligne["rang"]), ligne)
+        if tirage < self.taux_echec:
+            with self.lock:
+                self.echecs += 1
+            raise TimeoutError("réponse perdue (paquet appliqué)")
+
+
+class _RequeteSimulee:
+    def __init__(self, serveur, lignes):
+        self.serveur, self.lignes = serveur, lignes
+
+    def execute(self):
+        self.serveur.appliquer(self.lignes)
+
+
+def bench_lots(args):
+    from bulk_insert import insert_lots, lot_rows
+
+    lots = [{"Lot": str(i), "Montant": 1_000_000 + i, "Désignation": f"Lot {i} : travaux et fournitures"}
+            for i in range(1, args.lots + 1)]
+    latence_s, octets_par_s = args.latence_ms / 1000, 2_000_000
+    print(f"{args.lots} lots, latence {args.latence_ms:.0f} ms par requête")
+
+    # Ancienne méthode : une seule requête pour tous les lots, sans échec simulé
+    serveur = _ServeurSimule(latence_s, octets_par_s, taux_echec=0)
+    t0 = time.perf_counter()
+    serveur.upsert(lot_rows(1, lots)).execute()
+    duree = time.perf_counter() - t0
+    print(f"{'Requête unique':<30} {duree:>7.2f} s {args.lots / duree:>10,.0f} lots/s")
+
+    for libelle, workers, taux_echec in (("Paquets, 1 fil", 1, 0),
+                                          ("Paquets, 4 fils", 4, 0),
+                                          ("Paquets, 4 fils, 10 % d'échecs", 4, 0.10)):
+        serveur = _ServeurSimule(latence_s, octets_par_s, taux_echec)
+        rapport = insert_lots(serveur, 1, lots, workers=workers, backoff_seconds=0.01, retries=5)
+        attendus = {(1, rang) for rang in range(1, args.lots + 1)}
+        complet = set(serveur.lignes) == attendus and not rapport["echecs"]
+        print(f"{libelle:<30} {rapport['duree_s']:>7.2f} s {args.lots / rapport['duree_s']:>10,.0f} lots/s"
+              f"  {rapport['paquets']} paquets, {serveur.echecs} échecs retentés,"
+              f" {'complet sans doublon' if complet else 'INCOMPLET'}")
+
+
+# ============================
+# VÉRIFICATION DES POLICES : INDEX EN MÉMOIRE
+# ============================
+def bench_verification(args):
+    import json
+    import random
+    import threading
+    import urllib.request
+    from http.server import ThreadingHTTPServer
+
+    import verification
+
+    secret = "cle-de-mesure"
+    rng = random.Random(1)
+    index = verification.PoliceIndex(ttl_seconds=float("inf"))
+    t0 = time.perf_counter()
+    for i in range(args.polices):
+        index.add_police({
+            "police_num": f"3240-800{i:06d}25", "cotation_id": i,
+            "echeance": (datetime.date(2026, 1, 1) + datetime.timedelta(days=rng.randrange(730))).isoformat(),
+            "cotations": {"statut": "Contractualisée", "montant_caution": rng.randrange(1, 10**9),
+                          "assure": f"ASSURÉ {i}", "beneficiaire": "DOUANES", "couverture": "Bonne exécution"},
+        })
+    index.ready = True
+    print(f"Chargement de {len(index)} polices : {time.perf_counter() - t0:.2f} s")
+
+    demandes = [{"police": f"3240-800{rng.randrange(args.polices):06d}25"} for _ in range(10_000)]
+    for d in demandes:
+        d["jeton"] = verification.make_token(d["police"], secret)
+    demandes[0]["jeton"] = "FAUXJETON"
+    resultats, duree = timed(lambda: index.verify_many(demandes, secret), args.runs)
+    faux = [r for r in resultats if r.get("motif")]
+    print(f"Vérification en mémoire      {duree / len(demandes) * 1e6:>8.1f} µs/police"
+          f"  ({len(faux)} refus attendu{'s' if len(faux) > 1 else ''} : {len(faux) == 1})")
+
+    class Handler(verification.make_handler(None, index, secret)):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/verifier"
+    corps = json.dumps(demandes).encode()
+
+    def lot_http():
+        requete = urllib.request.Request(url, corps, {"Content-Type": "application/json"})
+        with urllib.request.urlopen(requete) as reponse:
+            return json.loads(reponse.read())
+
+    reponses, duree = timed(lot_http, args.runs)
+    print(f"Lot HTTP de {len(demandes)} polices    {duree * 1000:>8.0f} ms"
+          f"  (réponses identiques : {reponses == json.loads(json.dumps(resultats, default=str))})")
+    _, duree = timed(lambda: urllib.request.urlopen(
+        f"{url}?police={demandes[1]['police']}&jeton={demandes[1]['jeton']}").read(), args.runs * 20)
+    print(f"Vérification HTTP unitaire   {duree * 1000:>8.2f} ms")
+    server.shutdown()
+
+
+# ============================
+# FILE DES TRAVAUX : PRIORITÉS ET LATENCE INTERACTIVE
+# ============================
+def bench_file(args):
+    import os
+    import threading
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pdf_documents
+    from jobs import ANNULE, AdmissionRefused, DocumentQueue
+    from lot_documents import generate_lot_documents
+
+    # Règles de la file (travaux factices)
+    file = DocumentQueue(max_running=2, reserved_interactive=1, per_owner=1, max_per_owner=2)
+    lances = []
+    for i in range(4):
+        file.submit(f"lot-{i}", "actes", lambda job, i=i: (lances.append(i), time.sleep(0.2)))
+    contrat = file.submit("guichet", "contrat", lambda job: time.sleep(0.1))
+    contrat.wait(5)
+    cotation = file.submit("guichet", "cotation", lambda job: None)
+    cotation.wait(5)
+    annule = file.submit("lot-9", "actes", lambda job: lances.append(9))
+    file.cancel(annule.id)
+    file.submit("lot-0", "bordereau", lambda job: None)
+    try:
+        file.submit("lot-0", "export", lambda job: None)
+        plafond = False
+    except AdmissionRefused:
+        plafond = True
+    time.sleep(1.2)
+    attente = cotation.started - cotation.created
+    attente_contrat = contrat.started - contrat.created
+    print(f"Contrat lancé malgré 4 travaux de fond : {attente_contrat < 0.05} "
+          f"(attente {attente_contrat * 1000:.1f} ms)")
+    print(f"Cotation lancée malgré 4 travaux de fond : {attente < 0.05} (attente {attente * 1000:.1f} ms)")
+    print(f"Travail annulé en attente jamais lancé : {annule.state == ANNULE and 9 not in lances}")
+    print(f"Plafond par session appliqué : {plafond}")
+
+    # Latence d'une cotation pendant des actes par lot
+    workers = args.workers or os.cpu_count() or 1
+    lots = SAMPLE_LOTS * 8
+    cotation_seule = lambda: pdf_documents.generate_caution_pdf(SAMPLE_DATA, SAMPLE_LOTS)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        generate_lot_documents("contrat", SAMPLE_DATA, SAMPLE_LOTS[:1] * workers, executor=pool)
+        _, repos = timed(cotation_seule, args.runs)
+
+        def sous_charge(lancer):
+            fond = threading.Thread(target=lancer)
+            fond.start()
+            time.sleep(0.5)
+            _, duree = timed(cotation_seule, args.runs)
+            fond.join()
+            return duree
+
+        avant = sous_charge(lambda: generate_lot_documents("contrat", SAMPLE_DATA, lots, executor=pool))
+        file = DocumentQueue()
+        apres = sous_charge(lambda: file.submit(
+            "lot", "actes", lambda job: generate_lot_documents(
+                "contrat", SAMPLE_DATA, lots, executor=pool, job=job,
+                max_in_flight=max(1, workers - 1))).wait())
+    print(f"{workers} processus de rendu, {len(lots)} actes en fond")
+    print(f"{'Cotation au repos':<40} {repos * 1000:>7.0f} ms")
+    print(f"{'Pendant les actes (pool saturé)':<40} {avant * 1000:>7.0f} ms")
+    print(f"{'Pendant les actes (file, 1 cœur libre)':<40} {apres * 1000:>7.0f} ms")
+
+
+# ============================
+# SIGNATURE ÉLECTRONIQUE DES CONTRATS
+# ============================
+def _magasin_de_test(path, passphrase):
+    """PKCS#12 autosigné (clé RSA 2048) ; retourne le certificat au format asn1crypto."""
+    from asn1crypto import x509 as asn1_x509
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.hazmat.primitives.serialization import pkcs12
+    from cryptography.x509.oid import NameOID
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Caution Leadway (mesure)"),
+                      x509.NameAttribute(NameOID.ORGANIZATION_NAME, "Leadway Assurance")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name)
+            .public_key(key.public_key()).serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=30))
+            .add_extension(x509.KeyUsage(digital_signature=True, content_commitment=True,
+                                         key_encipherment=False, data_encipherment=False,
+                                         key_agreement=False, key_cert_sign=True, crl_sign=False,
+                                         encipher_only=False, decipher_only=False), critical=True)
+            .sign(key, hashes.SHA256()))
+    with open(path, "wb") as f:
+        f.write(pkcs12.serialize_key_and_certificates(
+            b"mesure", key, cert, None, serialization.BestAvailableEncryption(passphrase.encode())))
+    return asn1_x509.Certificate.load(cert.public_bytes(serialization.Encoding.DER))
+
+
+def bench_signature(args):
+    import os
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pdf_documents
+    import signing
+    from lot_documents import generate_lot_documents
+    from pdf_optimize import available as optimisation_disponible, optimize_pdf
+
+    if not signing.available():
+        print("pyHanko n'est pas installé : signature indisponible.")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        keystore = os.path.join(tmp, "mesure.p12")
+        racine = _magasin_de_test(keystore, "mesure")
+        config = {"keystore": keystore, "passphrase": "mesure"}
+
+        contrat = pdf_documents.generate_contrat_pdf(SAMPLE_DATA, SAMPLE_LOTS).getvalue()
+        if optimisation_disponible():
+            contrat = optimize_pdf(contrat)     # ordre de l'application : optimiser, puis signer
+        _, rendu = timed(lambda: pdf_documents.generate_contrat_pdf(SAMPLE_DATA, SAMPLE_LOTS), args.runs)
+
+        def avec_rechargement():
+            signing._signers.clear()
+            return signing.sign_document(contrat, config)
+
+        _, chargement = timed(lambda: (signing._signers.clear(), signing.load_signer(keystore, "mesure")),
+                              args.runs)
+        _, recharge = timed(avec_rechargement, args.runs)
+        signe, en_memoire = timed(lambda: signing.sign_document(contrat, config), args.runs)
+        print(f"Contrat : {len(contrat) / 1024:.0f} Ko, rendu {rendu * 1000:.0f} ms")
+        print(f"{'Déchiffrement du PKCS#12':<40} {chargement * 1000:>7.1f} ms")
+        print(f"{'Signature, clé rechargée à chaque fois':<40} {recharge * 1000:>7.1f} ms/document")
+        print(f"{'Signature, clé en mémoire':<40} {en_memoire * 1000:>7.1f} ms/document"
+              f"  (+{(len(signe) - len(contrat)) / 1024:.1f} Ko)")
+
+        etat = signing.verify_pdf(signe, [racine])
+        modifie = bytearray(signe)
+        modifie[signe.index(b"\n%") + 2] ^= 1     # commentaire binaire de l'en-tête, couvert par la signature
+        print(f"Signature intacte et de confiance : {len(etat) == 1 and etat[0]['intacte'] and etat[0]['valide']}"
+              f" ({etat[0]['couverture']})")
+        altere = signing.verify_pdf(bytes(modifie), [racine])
+        print(f"Altération détectée : {not altere[0]['intacte']}")
+
+        # Série : actes par lot signés dans les processus de rendu, clé chargée une fois par processus
+        workers = args.workers or os.cpu_count() or 1
+        lots = [{"Lot": str(i + 1), "Montant": 1_000_000 * (i + 1), "Désignation": f"Lot {i + 1}"}
+                for i in range(args.documents)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            generate_lot_documents("contrat", SAMPLE_DATA, lots[:workers], executor=pool, signature=config)
+            t0 = time.perf_counter()
+            sans = generate_lot_documents("contrat", SAMPLE_DATA, lots, executor=pool)
+            duree_sans = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            avec = generate_lot_documents("contrat", SAMPLE_DATA, lots, executor=pool, signature=config)
+            duree_avec = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            signing.sign_many([pdf for _, pdf in sans], config, executor=pool)
+            duree_serie = time.perf_counter() - t0
+        print(f"{len(lots)} actes par lot, {workers} processus")
+        print(f"{'Rendu seul':<40} {duree_sans / len(lots) * 1000:>7.1f} ms/acte")
+        print(f"{'Rendu et signature (même processus)':<40} {duree_avec / len(lots) * 1000:>7.1f} ms/acte")
+        print(f"{'Signature seule (série déjà rendue)':<40} {duree_serie / len(lots) * 1000:>7.1f} ms/acte")
+        print(f"Tous les actes signés : {all(signing.verify_pdf(pdf, [racine])[0]['valide'] for _, pdf in avec)}")
+
+
+# ============================
+# DOSSIER COURTIER : ASSEMBLAGE SANS RENDU
+# ============================
+def bench_dossier(args):
+    from io import BytesIO
+
+    from pypdf import PdfReader
+
+    import pdf_documents
+    from dossier import assemble_dossier
+    from lot_documents import generate_lot_documents, merge_documents
+    from pdf_optimize import available as optimisation_disponible, optimize_pdf
+
+    def images(pdf):
+        reader = PdfReader(BytesIO(pdf))
+        return len({page["/Resources"]["/XObject"].raw_get(nom).idnum
+                    for page in reader.pages if "/XObject" in page.get("/Resources", {})
+                    for nom in page["/Resources"]["/XObject"]})
+
+    cotation = pdf_documents.generate_caution_pdf(SAMPLE_DATA, SAMPLE_LOTS).getvalue()
+    contrat = pdf_documents.generate_contrat_pdf(SAMPLE_DATA, SAMPLE_LOTS).getvalue()
+    if optimisation_disponible():
+        cotation, contrat = optimize_pdf(cotation), optimize_pdf(contrat)   # documents tels que livrés
+    parts = [("Cotation", cotation), ("Contrat", contrat)]
+    dossier, duree = timed(lambda: assemble_dossier(parts).getvalue(), args.runs)
+    reader = PdfReader(BytesIO(dossier))
+    pages = sum(len(PdfReader(BytesIO(pdf)).pages) for _, pdf in parts)
+    signets = [item.title for item in reader.outline]
+    print(f"Cotation + contrat : {len(reader.pages)} pages (attendu {pages}), signets {signets}")
+    print(f"{'Assemblage':<40} {duree * 1000:>7.1f} ms")
+    print(f"{'Taille':<40} {len(dossier) / 1024:>7.0f} Ko"
+          f"  (documents sources : {(len(cotation) + len(contrat)) / 1024:.0f} Ko)")
+    print(f"{'Images distinctes':<40} {images(dossier):>7}"
+          f"  (sources : {images(cotation) + images(contrat)})")
+
+    actes = generate_lot_documents("contrat", SAMPLE_DATA, SAMPLE_LOTS)
+    fusion, duree = timed(lambda: merge_documents(actes).getvalue(), args.runs)
+    print(f"{'Fusion des actes par lot':<40} {duree * 1000:>7.1f} ms"
+          f"  ({len(PdfReader(BytesIO(fusion)).pages)} pages, {len(actes)} actes)")
+
+
+BENCHMARKS = {
+    "pdf": bench_pdf,
+    "lettres": bench_lettres,
+    "formatage": bench_formatage,
+    "polices": bench_polices,
+    "lots": bench_lots,
+    "verification": bench_verification,
+    "file": bench_file,
+    "signature": bench_signature,
+    "dossier": bench_dossier,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesures de performance (données d'exemple)")
+    parser.add_argument("mesure", choices=sorted(BENCHMARKS))
+    parser.add_argument("--runs", type=int, default=5, help="Exécutions par mesure")
+    parser.add_argument("--debit-mbits", type=float, default=2.0,
+                        help="Débit réseau simulé pour l'affichage de la 1re page")
+    parser.add_argument("--exhaustif", type=int, default=2_000_000,
+                        help="Montants en lettres : contrôle de 0 à N")
+    parser.add_argument("--lots", type=int, default=20_000, help="Insertion : nombre de lots")
+    parser.add_argument("--latence-ms", type=float, default=80.0,
+                        help="Insertion : latence simulée par requête")
+    parser.add_argument("--polices", type=int, default=200_000,
+                        help="Vérification : taille de l'index")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="File des travaux, signature : processus de rendu (défaut : cœurs)")
+    parser.add_argument("--documents", type=int, default=40,
+                        help="Signature : actes par lot signés en série")
+    args = parser.parse_args()
+    BENCHMARKS[args.mesure](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Bordereau mensuel de production (finance / réassurance) : toutes les
+polices émises sur le mois, avec assuré, couverture, montant cautionné
+et décompte de prime.
+
+Les lignes sont lues par pages (keyset sur polices.created_at, id) et
+écrites au fil de l'eau : CSV ligne à ligne, PDF dessiné page par page
+sur le canevas reportlab (pages compressées) avec sous-totaux de page et
+cumul reporté. La mémoire ne dépend pas du nombre de polices du mois.
+
+Usage :
+    python bordereau.py 2026 10 [--output bordereaux]
+"""
+import argparse
+import csv
+import datetime
+import os
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from cotation_history import apply_keyset
+from formatting import fmt_money, format_mois_fr
+
+PAGE_SIZE = 1000
+
+# (en-tête, clé, largeur en points)
+COLUMNS = [
+    ("N° police", "police_num", 82),
+    ("Date d'émission", "date_emission", 72),
+    ("Assuré", "assure", 140),
+    ("Couverture", "couverture", 88),
+    ("Montant cautionné", "montant_caution", 82),
+    ("Prime nette", "prime_nette", 70),
+    ("Accessoires", "accessoires", 56),
+    ("Frais d'analyse", "frais_analyse", 62),
+    ("Taxes", "taxes", 62),
+    ("Prime TTC", "prime_ttc", 74),
+]
+AMOUNT_KEYS = ["montant_caution", "prime_nette", "accessoires", "frais_analyse", "taxes", "prime_ttc"]
+
+
+def month_bounds(annee, mois):
+    debut = datetime.date(annee, mois, 1)
+    fin = datetime.date(annee + (mois == 12), mois % 12 + 1, 1)
+    return debut, fin
+
+
+def count_polices(client, debut, fin):
+    response = client.table('polices').select('id', count='exact') \
+                     .gte('created_at', debut.isoformat()) \
+                     .lt('created_at', fin.isoformat()) \
+                     .limit(1).execute()
+    return response.count or 0
+
+
+def iter_polices(client, debut, fin):
+    """Polices émises entre debut (inclus) et fin (exclu), une ligne à plat par police."""
+    cursor = None
+    while True:
+        query = client.table('polices') \
+                      .select('id, created_at, police_num, date_emission, '
+                              'cotations(assure, couverture, montant_caution, prime_nette, '
+                              'accessoires, frais_analyse, taxes, prime_ttc)') \
+                      .gte('created_at', debut.isoformat()) \
+                      .lt('created_at', fin.isoformat())
+        query = apply_keyset(query, cursor, desc=False)
+        rows = query.order('created_at').order('id').limit(PAGE_SIZE).execute().data or []
+        for row in rows:
+            cotation = row.pop("cotations", None) or {}
+            row.update(cotation)
+            for key in AMOUNT_KEYS:
+                row[key] = float(row.get(key) or 0)
+            yield row
+        if len(rows) < PAGE_SIZE:
+            break
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+class BordereauPDF:
+    """Écriture ligne à ligne, saut de page automatique, report des cumuls."""
+
+    MARGIN = 25
+    ROW_HEIGHT = 13
+    FONT_SIZE = 7
+
+    def __init__(self, path, titre):
+        self.width, self.height = landscape(A4)
+        self.canvas = canvas.Canvas(path, pagesize=landscape(A4), pageCompression=1)
+        self.titre = titre
+        self.page = 0
+        self.cumul = dict.fromkeys(AMOUNT_KEYS, 0.0)
+        self.sous_total = dict.fromkeys(AMOUNT_KEYS, 0.0)
+        self.lignes = 0
+        self._new_page()
+
+    def _text(self, x, y, width, text, bold=False, right=False):
+        font = "Helvetica-Bold" if bold else "Helvetica"
+        text = str(text or "")
+        if stringWidth(text, font, self.FONT_SIZE) > width - 4:
+            # Troncature : plus long préfixe qui tient dans la colonne
+            lo, hi = 0, len(text)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if stringWidth(text[:mid] + "…", font, self.FONT_SIZE) <= width - 4:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            text = text[:lo] + "…"
+        self.canvas.setFont(font, self.FONT_SIZE)
+        if right:
+            self.canvas.drawRightString(x + width - 2, y, text)
+        else:
+            self.canvas.drawString(x + 2, y, text)
+
+    def _amount_row(self, label, totals, bold=True):
+        x = self.MARGIN
+        for header, key, width in COLUMNS:
+            if key in totals:
+                self._text(x, self.y, width, fmt_money(totals[key]), bold=bold, right=True)
+            elif key == "assure":
+                self._text(x, self.y, width, label, bold=bold)
+            x += width
+        self.y -= self.ROW_HEIGHT
+
+    def _new_page(self):
+        self.page += 1
+        c = self.canvas
+        self.y = self.height - self.MARGIN
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(self.MARGIN, self.y - 4, self.titre)
+        c.setFont("Helvetica", 8)
+        c.drawRightString(self.width - self.MARGIN, self.y - 4, f"Page {self.page}")
+        self.y -= 24
+
+        c.setFillColor(colors.lightgrey)
+        c.rect(self.MARGIN, self.y - 3, sum(w for _, _, w in COLUMNS), self.ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(colors.black)
+        x = self.MARGIN
+        for header, key, width in COLUMNS:
+            self._text(x, self.y, width, header, bold=True, right=key in AMOUNT_KEYS)
+            x += width
+        self.y -= self.ROW_HEIGHT
+        if self.page > 1:
+            self._amount_row("Report", self.cumul, bold=False)
+
+    def _end_page(self):
+        self.y -= 2
+        self.canvas.line(self.MARGIN, self.y + self.ROW_HEIGHT - 3,
+                         self.MARGIN + sum(w for _, _, w in COLUMNS), self.y + self.ROW_HEIGHT - 3)
+        self._amount_row("Total page", self.sous_total)
+        self._amount_row("Cumul à reporter", self.cumul)
+        self.canvas.showPage()
+        self.sous_total = dict.fromkeys(AMOUNT_KEYS, 0.0)
+
+    def add_row(self, row):
+        # Place réservée en bas de page pour les deux lignes de totaux
+        if self.y < self.MARGIN + 3 * self.ROW_HEIGHT:
+            self._end_page()
+            self._new_page()
+        x = self.MARGIN
+        for header, key, width in COLUMNS:
+            if key in AMOUNT_KEYS:
+                self._text(x, self.y, width, fmt_money(row[key]), right=True)
+                self.sous_total[key] += row[key]
+                self.cumul[key] += row[key]
+            else:
+                self._text(x, self.y, width, row.get(key))
+            x += width
+        self.y -= self.ROW_HEIGHT
+        self.lignes += 1
+
+    def close(self):
+        self.y -= 2
+        self._amount_row("Total page", self.sous_total)
+        self._amount_row(f"TOTAL DU MOIS ({self.lignes} polices)", self.cumul)
+        self.canvas.showPage()
+        self.canvas.save()
+
+
+def generate_bordereau(client, annee, mois, output_dir="bordereaux", progress=None):
+    """
+    Écrit Bordereau_AAAA_MM.csv et .pdf dans output_dir.
+    progress(lignes_traitées, total) est appelé à chaque page lue.
+    Retourne {csv_path, pdf_path, lignes, totaux}.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    debut, fin = month_bounds(annee, mois)
+    total = count_polices(client, debut, fin)
+    base = os.path.join(output_dir, f"Bordereau_{annee}_{mois:02d}")
+
+    pdf = BordereauPDF(base + ".pdf", f"BORDEREAU DE PRODUCTION CAUTION – {format_mois_fr(annee, mois).upper()}")
+    with open(base + ".csv", "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow([header for header, _, _ in COLUMNS])
+        for n, row in enumerate(iter_polices(client, debut, fin), start=1):
+            writer.writerow([round(row[key]) if key in AMOUNT_KEYS else row.get(key)
+                             for _, key, _ in COLUMNS])
+            pdf.add_row(row)
+            if progress and n % PAGE_SIZE == 0:
+                progress(n, total)
+    pdf.close()
+    if progress:
+        progress(pdf.lignes, total)
+
+    return {"csv_path": base + ".csv", "pdf_path": base + ".pdf",
+            "lignes": pdf.lignes, "totaux": pdf.cumul}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bordereau mensuel de production")
+    parser.add_argument("annee", type=int)
+    parser.add_argument("mois", type=int)
+    parser.add_argument("--output", default="bordereaux", help="Dossier de sortie")
+    args = parser.parse_args()
+
+    from supabase_client import create_supabase_client
+
+    def progress(done, total):
+        print(f"\r{done}/{total} polices", end="", flush=True)
+
+    result = generate_bordereau(create_supabase_client(), args.annee, args.mois, args.output, progress)
+    print(f"\n{result['lignes']} polices – prime TTC {fmt_money(result['totaux']['prime_ttc'])}")
+    print(f"{result['csv_path']}\n{result['pdf_path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Insertion en masse (lots des grands appels d'offres).
+
+Les lignes sont découpées en paquets bornés en nombre et en taille JSON,
+envoyés en parallèle sur un nombre borné de fils (autant de connexions
+simultanées au plus). Chaque paquet est un upsert sur une clé naturelle
+(pour les lots : cotation_id, rang) : un paquet relancé après une erreur
+réseau, même s'il avait été appliqué côté serveur, ne crée pas de
+doublon. Un paquet en échec est retenté seul, avec attente croissante ;
+les autres ne sont pas affectés.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MAX_ROWS = 500
+MAX_BYTES = 256 * 1024
+WORKERS = 4
+RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+
+def chunk_rows(rows, max_rows=MAX_ROWS, max_bytes=MAX_BYTES):
+    """Paquets consécutifs d'au plus max_rows lignes et d'environ max_bytes octets JSON."""
+    chunk, size = [], 0
+    for row in rows:
+        row_size = len(json.dumps(row, default=str)) + 1
+        if chunk and (len(chunk) >= max_rows or size + row_size > max_bytes):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        yield chunk
+
+
+def insert_chunked(client, table, rows, on_conflict, workers=WORKERS, retries=RETRIES,
+                   backoff_seconds=BACKOFF_SECONDS, progress=None, **chunk_options):
+    """
+    Upsert de rows dans table, par paquets concurrents.
+    progress(lignes_enregistrées, total) est appelé après chaque paquet.
+    Retourne {lignes, paquets, enregistrees, echecs: [(n° de paquet, erreur)], duree_s}.
+    """
+    chunks = list(chunk_rows(rows, **chunk_options))
+    report = {"lignes": len(rows), "paquets": len(chunks), "enregistrees": 0, "echecs": []}
+    lock = threading.Lock()
+
+    def send(chunk):
+        for attempt in range(retries + 1):
+            try:
+                client.table(table).upsert(chunk, on_conflict=on_conflict,
+                                           ignore_duplicates=True).execute()
+                return
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(backoff_seconds * 2 ** attempt)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"insert-{table}") as pool:
+        futures = {pool.submit(send, chunk): (index, len(chunk)) for index, chunk in enumerate(chunks)}
+        for future in as_completed(futures):
+            index, count = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                report["echecs"].append((index, str(e)))
+                continue
+            with lock:
+                report["enregistrees"] += count
+            if progress:
+                progress(report["enregistrees"], len(rows))
+    report["echecs"].sort()
+    report["duree_s"] = time.perf_counter() - t0
+    return report
+
+
+def lot_rows(cotation_id, lots_data):
+    """Lignes de la table lots ; rang conserve l'ordre de saisie malgré l'envoi concurrent."""
+    return [{
+        "cotation_id": cotation_id,
+        "rang": rang,
+        "lot_num": lot.get("Lot"),
+        "montant": lot.get("Montant"),
+        "designation": lot.get("Désignation"),
+    } for rang, lot in enumerate(lots_data, start=1)]
+
+
+def insert_lots(client, cotation_id, lots_data, progress=None, **options):
+    return insert_chunked(client, "lots", lot_rows(cotation_id, lots_data),
+                          on_conflict="cotation_id,rang", progress=progress, **options)
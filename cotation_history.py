@@ -0,0 +1,114 @@
+"""
+Lecture des cotations enregistrées.
+
+Historique : filtres appliqués côté serveur et pagination par clé
+(keyset) sur (created_at, id), sans OFFSET ni comptage total. Les lots
+et la police d'une cotation ne sont lus qu'à la demande.
+
+Index correspondants : supabase/migrations/20261019090000_history_indexes.sql
+"""
+import datetime
+
+# Champs de la table cotations repris tels quels dans "data"
+COTATION_FIELDS = [
+    "assure", "souscripteur", "beneficiaire", "adresse_beneficiaire", "adresse",
+    "situation_geo", "num_marche", "autorite", "date_depot", "objet", "couverture",
+    "montant_marche", "duree", "montant_caution", "prime_nette", "frais_analyse",
+    "accessoires", "taxes", "prime_ttc", "date_cotation", "suretes_text",
+]
+
+HISTORY_COLUMNS = ("id, created_at, assure, num_marche, couverture, montant_caution, "
+                   "prime_ttc, statut, date_cotation")
+
+
+def sort_lots(lots):
+    """Lots dans l'ordre de saisie (rang ; id pour les lots antérieurs au rang)."""
+    return sorted(lots or [], key=lambda lot: (lot.get("rang") or 0, lot["id"]))
+
+
+def cotation_from_row(row):
+    """
+    Ligne cotations (avec ses lots embarqués) -> dictionnaire
+    {data, lots_data, detail_agrement, statut} attendu par les générateurs PDF.
+    """
+    lots = sort_lots(row.get("lots"))
+    return {
+        "data": {field: row.get(field) for field in COTATION_FIELDS},
+        "lots_data": [{"Lot": lot.get("lot_num"),
+                       "Montant": lot.get("montant") or 0,
+                       "Désignation": lot.get("designation")} for lot in lots],
+        "detail_agrement": row.get("detail_agrement") or "",
+        "statut": row.get("statut"),
+    }
+
+
+def apply_keyset(query, cursor, column="created_at", desc=True):
+    """
+    Ajoute la condition (column, id) < cursor pour un parcours décroissant
+    (> cursor si desc=False).
+    cursor : (valeur, id) de la dernière ligne de la page précédente, ou None.
+    """
+    if not cursor:
+        return query
+    value, last_id = cursor
+    op = "lt" if desc else "gt"
+    return query.or_(f'{column}.{op}."{value}",and({column}.eq."{value}",id.{op}.{last_id})')
+
+
+def fetch_history_page(client, filters=None, cursor=None, page_size=50):
+    """
+    Lit une page de l'historique.
+    filters : dict optionnel (assure, num_marche, couverture, statut, date_debut, date_fin).
+    Retourne (lignes, curseur_suivant) ; curseur_suivant vaut None en fin de liste.
+    """
+    filters = filters or {}
+    query = client.table('cotations').select(HISTORY_COLUMNS)
+
+    if filters.get("assure"):
+        query = query.ilike('assure', f"%{filters['assure']}%")
+    if filters.get("num_marche"):
+        query = query.ilike('num_marche', f"%{filters['num_marche']}%")
+    if filters.get("couverture"):
+        query = query.eq('couverture', filters["couverture"])
+    if filters.get("statut"):
+        query = query.eq('statut', filters["statut"])
+    if filters.get("date_debut"):
+        query = query.gte('created_at', filters["date_debut"].isoformat())
+    if filters.get("date_fin"):
+        fin = filters["date_fin"] + datetime.timedelta(days=1)
+        query = query.lt('created_at', fin.isoformat())
+
+    query = apply_keyset(query, cursor)
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    response = query.order('created_at', desc=True) \
+                    .order('id', desc=True) \
+                    .limit(page_size + 1) \
+                    .execute()
+    rows = response.data or []
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+def fetch_cotation_details(client, cotation_id):
+    """Lots et police d'une cotation, en une seule requête embarquée."""
+    response = client.table('cotations') \
+                     .select('id, lots(id, rang, lot_num, montant, designation), '
+                             'polices(police_num, date_emission, date_effet, date_echeance, duree_police)') \
+                     .eq('id', cotation_id) \
+                     .limit(1) \
+                     .execute()
+    if not response.data:
+        return {"lots": [], "polices": []}
+    row = response.data[0]
+    polices = row.get("polices") or []
+    # Relation 1-1 possible (contrainte UNIQUE sur cotation_id) : PostgREST renvoie alors un objet
+    if isinstance(polices, dict):
+        polices = [polices]
+    return {
+        "lots": sort_lots(row.get("lots")),
+        "polices": polices,
+    }
@@ -0,0 +1,169 @@
+"""
+Index en mémoire des contreparties déjà saisies (assurés, autorités
+contractantes, bénéficiaires) pour la saisie assistée.
+
+Recherche par préfixe (liste triée + bisect) complétée par une recherche
+par trigrammes (fautes de frappe, mots au milieu du nom). L'index est
+construit depuis la table cotations, puis complété sur TTL par les seules
+lignes modifiées depuis le dernier filigrane (updated_at, id) : aucune
+requête base par frappe.
+"""
+import bisect
+import threading
+import time
+import unicodedata
+
+from cotation_history import apply_keyset
+
+PAGE_SIZE = 1000
+MAX_POSTING = 2000
+EMPTY_VALUES = {"", "n/a"}
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.split()).casefold()
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PrefixIndex:
+    """Noms normalisés -> {nom, adresse, occurrences}."""
+
+    def __init__(self):
+        self._records = {}
+        self._keys = []             # clés normalisées triées
+        self._grams = {}            # trigramme -> ensemble de clés
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, nom, adresse=None, count=True):
+        nom = (nom or "").strip()
+        key = normalize(nom)
+        if key in EMPTY_VALUES:
+            return
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = {"nom": nom, "adresse": None, "occurrences": 0}
+            bisect.insort(self._keys, key)
+            for gram in trigrams(key):
+                self._grams.setdefault(gram, set()).add(key)
+        if count:
+            record["occurrences"] += 1
+        # L'adresse la plus récente l'emporte
+        if adresse and normalize(adresse) not in EMPTY_VALUES:
+            record["adresse"] = adresse.strip()
+
+    def get(self, nom):
+        record = self._records.get(normalize(nom))
+        return dict(record) if record else None
+
+    def suggest(self, query, limit=5):
+        key = normalize(query)
+        if not key:
+            return []
+
+        # 1. Préfixe : plage contiguë de la liste triée
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_left(self._keys, key + "\uffff", start)
+        if end - start > MAX_POSTING:
+            # Préfixe très court : ordre alphabétique, sans classement
+            found = self._keys[start:start + limit]
+        else:
+            found = sorted(self._keys[start:end],
+                           key=lambda k: -self._records[k]["occurrences"])[:limit]
+
+        # 2. Trigrammes : complète avec les noms les plus proches
+        if len(found) < limit and len(key) >= 3:
+            # Les trigrammes trop fréquents ("soc", "ent"...) ne discriminent pas :
+            # on ne parcourt que les listes courtes (à défaut, les deux plus rares)
+            postings = sorted((self._grams.get(g, ()) for g in trigrams(key)), key=len)
+            usable = [p for p in postings if len(p) <= MAX_POSTING] or postings[:2]
+            scores = {}
+            for posting in usable:
+                for k in posting:
+                    scores[k] = scores.get(k, 0) + 1
+            seen = set(found)
+            ranked = sorted(
+                (k for k, n in scores.items() if k not in seen and n * 2 >= len(usable)),
+                key=lambda k: (-scores[k], -self._records[k]["occurrences"]))
+            found += ranked[:limit - len(found)]
+
+        return [dict(self._records[k]) for k in found]
+
+
+class CounterpartyIndex:
+
+    KINDS = ("assure", "autorite", "beneficiaire")
+
+    def __init__(self, ttl_seconds=300):
+        self.ttl_seconds = ttl_seconds
+        self.ready = False
+        self._indexes = {kind: PrefixIndex() for kind in self.KINDS}
+        self._cursor = None         # (updated_at, id) de la dernière ligne lue
+        self._seen_ids = set()      # cotations déjà comptées
+        self._last_refresh = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def suggest(self, kind, query, limit=5):
+        with self._lock:
+            return self._indexes[kind].suggest(query, limit)
+
+    def lookup(self, kind, nom):
+        """Enregistrement exact (nom normalisé), ou None."""
+        with self._lock:
+            return self._indexes[kind].get(nom)
+
+    def add_cotation(self, row):
+        """Indexe une cotation (une cotation modifiée ne compte qu'une fois)."""
+        with self._lock:
+            count = row.get("id") not in self._seen_ids
+            self._seen_ids.add(row.get("id"))
+            self._indexes["assure"].add(row.get("assure"), row.get("adresse"), count)
+            self._indexes["autorite"].add(row.get("autorite"), count=count)
+            if normalize(row.get("beneficiaire")) != normalize(row.get("assure")):
+                self._indexes["beneficiaire"].add(row.get("beneficiaire"),
+                                                  row.get("adresse_beneficiaire"), count)
+
+    def refresh(self, client):
+        """Lit les cotations modifiées depuis le dernier passage (toutes au premier)."""
+        while True:
+            query = client.table('cotations') \
+                          .select('id, updated_at, assure, adresse, autorite, '
+                                  'beneficiaire, adresse_beneficiaire')
+            query = apply_keyset(query, self._cursor, column="updated_at", desc=False)
+            rows = query.order('updated_at').order('id').limit(PAGE_SIZE).execute().data or []
+            for row in rows:
+                self.add_cotation(row)
+            if rows:
+                self._cursor = (rows[-1]["updated_at"], rows[-1]["id"])
+            if len(rows) < PAGE_SIZE:
+                break
+        self.ready = True
+        self._last_refresh = time.monotonic()
+
+    def maybe_refresh(self, client):
+        """Rafraîchit en arrière-plan si le TTL est écoulé."""
+        with self._lock:
+            if self._refreshing:
+                return
+            # Après un échec (chargement initial compris), nouvel essai au TTL suivant
+            if self._last_refresh and time.monotonic() - self._last_refresh < self.ttl_seconds:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(client)
+            except Exception:
+                self._last_refresh = time.monotonic()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="counterparty-index", daemon=True).start()
@@ -0,0 +1,90 @@
+"""
+Dossier courtier : assemblage en un seul PDF de documents déjà générés
+(cotation avec son annexe des lots, contrat, actes par lot...) sans
+repasser par reportlab.
+
+Les pages sont recopiées telles quelles (objets PDF, sans mise en page) ;
+les images identiques d'un document à l'autre (logo, cachet) sont ensuite
+fusionnées, si bien que le dossier n'en contient qu'une copie. Elles sont
+comparées sur leurs données encore compressées : un logo de 5000 × 5000
+pixels n'est jamais décodé (pypdf, qui décode chaque flux pour comparer
+les objets, dépasse sa limite de décompression sur ces logos). Le coût est
+proportionnel au nombre de pages et d'objets, pas au temps de mise en page.
+
+Repose sur pikepdf ; sans pikepdf, les documents sont mis bout à bout par
+pypdf, sans fusion des images.
+
+Usage :
+    python dossier.py Cotation.pdf Contrat_3240.pdf -o Dossier_3240.pdf
+"""
+import argparse
+import os
+from io import BytesIO
+
+from pdf_optimize import _dedupe_images, available as pikepdf_available
+
+
+def _assemble_pypdf(parts):
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    for label, pdf in parts:
+        start = len(writer.pages)
+        writer.append(PdfReader(BytesIO(pdf)), import_outline=False)
+        writer.add_outline_item(label, start)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer
+
+
+def assemble_dossier(parts):
+    """
+    parts : [(libellé, octets PDF)], dans l'ordre du dossier.
+    Retourne un BytesIO avec un signet par partie.
+    """
+    if not pikepdf_available():
+        buffer = _assemble_pypdf(parts)
+        buffer.seek(0)
+        return buffer
+
+    import pikepdf
+
+    sources = []
+    with pikepdf.new() as dossier:
+        with dossier.open_outline() as outline:
+            for label, pdf in parts:
+                source = pikepdf.open(BytesIO(pdf))
+                sources.append(source)   # ouvertes jusqu'à l'écriture
+                outline.root.append(pikepdf.OutlineItem(label, len(dossier.pages)))
+                dossier.pages.extend(source.pages)
+        # Logo et cachet communs : une seule copie
+        _dedupe_images(dossier)
+        buffer = BytesIO()
+        dossier.save(buffer,
+                     compress_streams=False,
+                     stream_decode_level=pikepdf.StreamDecodeLevel.none)
+    for source in sources:
+        source.close()
+    buffer.seek(0)
+    return buffer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assemblage d'un dossier PDF sans nouveau rendu")
+    parser.add_argument("documents", nargs="+", help="PDF à assembler, dans l'ordre")
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+
+    parts = []
+    for path in args.documents:
+        with open(path, "rb") as f:
+            parts.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+    dossier = assemble_dossier(parts).getvalue()
+    with open(args.output, "wb") as f:
+        f.write(dossier)
+    total = sum(len(pdf) for _, pdf in parts)
+    print(f"{args.output} : {len(dossier) / 1024:.0f} Ko (documents sources : {total / 1024:.0f} Ko)")
+
+
+if __name__ == "__main__":
+    main()
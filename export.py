@@ -0,0 +1,302 @@
+"""
+Export brut du portefeuille : cotations jointes à leurs lots et polices,
+sur une période de création quelconque.
+
+Les cotations sont lues par pages (keyset sur created_at, id ; lots et
+police embarqués dans la même requête) et produites ligne à ligne par un
+générateur : une ligne par lot, ou une seule ligne pour une cotation
+sans lot. Les écrivains consomment ce générateur par blocs :
+  - CSV : blocs d'octets (64 Ko) écrits dans un fichier ou envoyés tels
+    quels sur une réponse HTTP chunked ;
+  - XLSX : xlsxwriter en mode constant_memory (une ligne à la fois).
+La mémoire reste bornée quelle que soit la période exportée.
+
+Le service HTTP ne répond qu'aux liens signés et à durée limitée
+(export_url, HMAC-SHA256 de la clé EXPORT_SECRET sur format, période et
+expiration), produits par la page Export de l'application.
+
+Usage :
+    python export.py csv 2024-01-01 2026-12-31 -o export.csv
+    python export.py xlsx 2024-01-01 2026-12-31 -o export.xlsx
+    EXPORT_SECRET=... python export.py serve --port 8502
+        GET /export.csv?du=2024-01-01&au=2026-12-31&exp=...&sig=...   (flux chunked)
+        GET /export.xlsx?du=...&au=...&exp=...&sig=...
+"""
+import argparse
+import csv
+import datetime
+import hashlib
+import hmac
+import io
+import os
+import shutil
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from cotation_history import apply_keyset, sort_lots
+
+PAGE_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+URL_TTL_SECONDS = 900
+
+# (en-tête, clé)
+EXPORT_COLUMNS = [
+    ("ID cotation", "id"),
+    ("Créée le", "created_at"),
+    ("Date cotation", "date_cotation"),
+    ("Assuré", "assure"),
+    ("Souscripteur", "souscripteur"),
+    ("Bénéficiaire", "beneficiaire"),
+    ("Numéro du marché", "num_marche"),
+    ("Autorité contractante", "autorite"),
+    ("Objet", "objet"),
+    ("Couverture", "couverture"),
+    ("Statut", "statut"),
+    ("Montant du marché", "montant_marche"),
+    ("Montant à cautionner", "montant_caution"),
+    ("Prime nette", "prime_nette"),
+    ("Accessoires", "accessoires"),
+    ("Frais d'analyse", "frais_analyse"),
+    ("Taxes", "taxes"),
+    ("Prime TTC", "prime_ttc"),
+    ("Lot", "lot_num"),
+    ("Montant du lot", "lot_montant"),
+    ("Désignation du lot", "lot_designation"),
+    ("N° police", "police_num"),
+    ("Date d'émission", "date_emission"),
+    ("Date d'effet", "date_effet"),
+    ("Date d'échéance", "date_echeance"),
+]
+
+COTATION_SELECT = (
+    "id, created_at, date_cotation, assure, souscripteur, beneficiaire, num_marche, autorite, "
+    "objet, couverture, statut, montant_marche, montant_caution, prime_nette, accessoires, "
+    "frais_analyse, taxes, prime_ttc, "
+    "lots(id, rang, lot_num, montant, designation), "
+    "polices(police_num, date_emission, date_effet, date_echeance)"
+)
+
+
+def iter_export_rows(client, debut, fin, progress=None):
+    """
+    Lignes d'export (dict) des cotations créées entre debut et fin inclus.
+    progress(cotations lues) est appelé avant chaque page : progression et,
+    depuis la file des travaux (job.report), point d'annulation.
+    """
+    fin_exclue = fin + datetime.timedelta(days=1)
+    cursor = None
+    lues = 0
+    while True:
+        if progress:
+            progress(lues)
+        query = client.table('cotations').select(COTATION_SELECT) \
+                      .gte('created_at', debut.isoformat()) \
+                      .lt('created_at', fin_exclue.isoformat())
+        query = apply_keyset(query, cursor, desc=False)
+        rows = query.order('created_at').order('id').limit(PAGE_SIZE).execute().data or []
+        lues += len(rows)
+        for row in rows:
+            lots = sort_lots(row.pop("lots", None))
+            polices = row.pop("polices", None) or []
+            if isinstance(polices, dict):
+                polices = [polices]
+            if polices:
+                row.update(polices[0])
+            if not lots:
+                yield row
+            for lot in lots:
+                yield {**row, "lot_num": lot.get("lot_num"), "lot_montant": lot.get("montant"),
+                       "lot_designation": lot.get("designation")}
+        if len(rows) < PAGE_SIZE:
+            break
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+def iter_csv_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Blocs d'octets CSV (UTF-8 avec BOM, séparateur ';' pour Excel)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    buffer.write("\ufeff")
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+    for row in rows:
+        writer.writerow([row.get(key) for _, key in EXPORT_COLUMNS])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_csv(rows, path):
+    """Écrit le CSV par blocs ; retourne le nombre d'octets."""
+    size = 0
+    with open(path, "wb") as f:
+        for chunk in iter_csv_chunks(rows):
+            f.write(chunk)
+            size += len(chunk)
+    return size
+
+
+def write_xlsx(rows, path):
+    """Écrit le classeur ligne par ligne (constant_memory) ; retourne le nombre de lignes."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    sheet = workbook.add_worksheet("Portefeuille")
+    bold = workbook.add_format({"bold": True})
+    sheet.write_row(0, 0, [header for header, _ in EXPORT_COLUMNS], bold)
+    n = 0
+    for n, row in enumerate(rows, start=1):
+        sheet.write_row(n, 0, [row.get(key) for _, key in EXPORT_COLUMNS])
+    workbook.close()
+    return n
+
+
+def export_to_file(client, fmt, debut, fin, path, progress=None):
+    """Écrit l'export ; un fichier interrompu (progress a levé une exception) est supprimé."""
+    rows = iter_export_rows(client, debut, fin, progress)
+    try:
+        if fmt == "xlsx":
+            write_xlsx(rows, path)
+        else:
+            write_csv(rows, path)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return os.path.getsize(path)
+
+
+# ============================
+# LIENS SIGNÉS
+# ============================
+def sign_export(fmt, debut, fin, expires, secret):
+    message = f"{fmt}|{debut.isoformat()}|{fin.isoformat()}|{expires}"
+    return hmac.new(secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+def export_url(base_url, fmt, debut, fin, secret, ttl_seconds=URL_TTL_SECONDS):
+    """Lien de téléchargement valable ttl_seconds, pour ce format et cette période seulement."""
+    expires = int(time.time()) + ttl_seconds
+    query = urlencode({"du": debut.isoformat(), "au": fin.isoformat(), "exp": expires,
+                       "sig": sign_export(fmt, debut, fin, expires, secret)})
+    return f"{base_url.rstrip('/')}/export.{fmt}?{query}"
+
+
+def check_export_signature(fmt, debut, fin, expires, signature, secret, now=None):
+    if expires < (now or time.time()):
+        return False
+    return hmac.compare_digest(sign_export(fmt, debut, fin, expires, secret), signature or "")
+
+
+# ============================
+# SERVICE HTTP (mode sans Streamlit)
+# ============================
+def make_handler(client, secret):
+
+    class ExportHandler(BaseHTTPRequestHandler):
+        # Transfer-Encoding: chunked n'existe qu'en HTTP/1.1
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path not in ("/export.csv", "/export.xlsx"):
+                self.send_error(404)
+                return
+            params = parse_qs(url.query)
+            try:
+                debut = datetime.date.fromisoformat(params["du"][0])
+                fin = datetime.date.fromisoformat(params["au"][0])
+            except (KeyError, ValueError):
+                self.send_error(400, "Paramètres du=AAAA-MM-JJ et au=AAAA-MM-JJ requis")
+                return
+            fmt = url.path.rsplit(".", 1)[1]
+            try:
+                expires = int(params["exp"][0])
+                signature = params["sig"][0]
+            except (KeyError, ValueError):
+                self.send_error(403, "Lien non signé")
+                return
+            if not check_export_signature(fmt, debut, fin, expires, signature, secret):
+                self.send_error(403, "Lien invalide ou expiré")
+                return
+            nom = f"Export_{debut.isoformat()}_{fin.isoformat()}"
+            if url.path == "/export.csv":
+                self._send_csv(client, debut, fin, nom + ".csv")
+            else:
+                self._send_xlsx(client, debut, fin, nom + ".xlsx")
+
+        def _headers(self, content_type, filename, length=None):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+            if length is None:
+                self.send_header("Transfer-Encoding", "chunked")
+            else:
+                self.send_header("Content-Length", str(length))
+            self.end_headers()
+
+        def _send_csv(self, client, debut, fin, filename):
+            self._headers("text/csv; charset=utf-8", filename)
+            for chunk in iter_csv_chunks(iter_export_rows(client, debut, fin)):
+                self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _send_xlsx(self, client, debut, fin, filename):
+            # Le format zip impose d'écrire le classeur avant de l'envoyer
+            fd, path = tempfile.mkstemp(suffix=".xlsx")
+            os.close(fd)
+            try:
+                size = export_to_file(client, "xlsx", debut, fin, path)
+                self._headers("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                              filename, size)
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+            finally:
+                os.remove(path)
+
+    return ExportHandler
+
+
+def serve(client, secret, host="127.0.0.1", port=8502):
+    server = ThreadingHTTPServer((host, port), make_handler(client, secret))
+    print(f"Export disponible sur http://{host}:{port} (liens signés par la page Export)")
+    server.serve_forever()
+
+
+def read_secret():
+    """Clé des liens : variable d'environnement EXPORT_SECRET, à défaut secrets.toml."""
+    secret = os.environ.get("EXPORT_SECRET")
+    if not secret:
+        import streamlit as st
+        secret = st.secrets["EXPORT_SECRET"]
+    return secret
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export du portefeuille (cotations, lots, polices)")
+    sub = parser.add_subparsers(dest="commande", required=True)
+    for fmt in ("csv", "xlsx"):
+        p = sub.add_parser(fmt, help=f"Exporter en {fmt.upper()}")
+        p.add_argument("du", type=datetime.date.fromisoformat)
+        p.add_argument("au", type=datetime.date.fromisoformat)
+        p.add_argument("-o", "--output", required=True)
+    p = sub.add_parser("serve", help="Servir les exports en flux HTTP")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    from supabase_client import create_supabase_client
+    client = create_supabase_client()
+    if args.commande == "serve":
+        serve(client, read_secret(), args.host, args.port)
+    else:
+        size = export_to_file(client, args.commande, args.du, args.au, args.output)
+        print(f"{args.output} ({size / 1_048_576:.1f} Mo)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Index d'engagement cumulé par assuré (capacité de souscription).
+
+Engagement d'un assuré = somme des montant_caution de ses polices non
+échues. L'index est :
+  - chargé une fois par processus (en arrière-plan) ;
+  - mis à jour à chaque police enregistrée (record) ;
+  - complété périodiquement par les polices créées depuis le dernier
+    filigrane created_at (autres répliques), sans relecture complète ;
+  - consulté en O(1) amorti au moment de la cotation (check).
+Les montants échus sont retirés au fil de l'eau via un tas trié par échéance.
+"""
+import datetime
+import heapq
+import threading
+import time
+
+from cotation_history import apply_keyset
+
+PAGE_SIZE = 1000
+
+
+def normalize_assure(nom):
+    return " ".join((nom or "").split()).casefold()
+
+
+class ExposureIndex:
+
+    def __init__(self, limit=None, alert_ratio=0.8, refresh_interval_seconds=300):
+        self.limit = limit
+        self.alert_ratio = alert_ratio
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.ready = False
+        self._totals = {}
+        self._expiries = []         # tas de (échéance, assuré normalisé, montant)
+        self._seen = set()          # IDs de polices déjà comptées
+        self._watermark = None      # created_at le plus récent lu en base
+        self._last_refresh = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    # ---------- Lecture (chemin critique) ----------
+    def exposure(self, assure):
+        with self._lock:
+            self._prune(datetime.date.today())
+            return self._totals.get(normalize_assure(assure), 0.0)
+
+    def check(self, assure, montant):
+        """
+        Retourne (niveau, engagement_actuel, engagement_projeté) ;
+        niveau : "ok", "alerte" (seuil alert_ratio atteint) ou "depassement".
+        """
+        actuel = self.exposure(assure)
+        projete = actuel + float(montant or 0)
+        if not self.limit:
+            return "ok", actuel, projete
+        if projete > self.limit:
+            return "depassement", actuel, projete
+        if projete >= self.alert_ratio * self.limit:
+            return "alerte", actuel, projete
+        return "ok", actuel, projete
+
+    # ---------- Mises à jour ----------
+    def record(self, police_id, assure, montant, echeance, created_at=None):
+        """Ajoute une police (ignorée si déjà comptée ou déjà échue)."""
+        if isinstance(echeance, str):
+            echeance = datetime.date.fromisoformat(echeance[:10])
+        with self._lock:
+            if police_id in self._seen:
+                return
+            self._seen.add(police_id)
+            if created_at and (self._watermark is None or created_at > self._watermark):
+                self._watermark = created_at
+            if echeance is None or echeance < datetime.date.today():
+                return
+            key = normalize_assure(assure)
+            montant = float(montant or 0)
+            self._totals[key] = self._totals.get(key, 0.0) + montant
+            heapq.heappush(self._expiries, (echeance, key, montant))
+
+    def warm(self, client):
+        """Chargement initial : polices non échues, lues par pages (keyset sur id)."""
+        today = datetime.date.today().isoformat()
+        last_id = None
+        while True:
+            query = client.table('polices') \
+                          .select('id, created_at, echeance, cotations(assure, montant_caution)') \
+                          .gte('echeance', today)
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            rows = query.order('id').limit(PAGE_SIZE).execute().data or []
+            self._apply(rows)
+            if len(rows) < PAGE_SIZE:
+                break
+            last_id = rows[-1]["id"]
+        # Filigrane : création la plus récente, échue ou non
+        latest = client.table('polices').select('created_at') \
+                       .order('created_at', desc=True).limit(1).execute().data
+        with self._lock:
+            if latest and (self._watermark is None or latest[0]["created_at"] > self._watermark):
+                self._watermark = latest[0]["created_at"]
+            self.ready = True
+            self._last_refresh = time.monotonic()
+
+    def refresh(self, client):
+        """Lit uniquement les polices créées depuis le dernier filigrane."""
+        cursor = None
+        while True:
+            query = client.table('polices') \
+                          .select('id, created_at, echeance, cotations(assure, montant_caution)')
+            if cursor:
+                # Pages suivantes : au-delà de la dernière ligne lue (created_at, id)
+                query = apply_keyset(query, cursor, column="created_at", desc=False)
+            elif self._watermark:
+                query = query.gte('created_at', self._watermark)
+            rows = query.order('created_at').order('id').limit(PAGE_SIZE).execute().data or []
+            self._apply(rows)
+            if len(rows) < PAGE_SIZE:
+                break
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
+        self._last_refresh = time.monotonic()
+
+    def maybe_refresh(self, client):
+        """Déclenche warm/refresh en arrière-plan si l'intervalle est écoulé."""
+        with self._lock:
+            if self._refreshing:
+                return
+            # Après un échec (chargement initial compris), nouvel essai à l'intervalle suivant
+            if self._last_refresh and time.monotonic() - self._last_refresh < self.refresh_interval_seconds:
+                return
+            self._refreshing = True
+        task = self.refresh if self.ready else self.warm
+
+        def run():
+            try:
+                task(client)
+            except Exception:
+                self._last_refresh = time.monotonic()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="exposure-index", daemon=True).start()
+
+    # ---------- Interne ----------
+    def _apply(self, rows):
+        for row in rows:
+            cotation = row.get("cotations") or {}
+            if isinstance(cotation, list):
+                cotation = cotation[0] if cotation else {}
+            self.record(row["id"], cotation.get("assure"), cotation.get("montant_caution"),
+                        row.get("echeance"), row.get("created_at"))
+
+    def _prune(self, today):
+        while self._expiries and self._expiries[0][0] < today:
+            _, key, montant = heapq.heappop(self._expiries)
+            reste = self._totals.get(key, 0.0) - montant
+            if reste > 0.5:
+                self._totals[key] = reste
+            else:
+                self._totals.pop(key, None)
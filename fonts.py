@@ -0,0 +1,146 @@
+"""
+Polices TrueType des documents (couverture Unicode : « œ », « ◆ », « € »...).
+
+L'enregistrement est fait une seule fois par processus : la lecture et
+l'analyse du fichier TTF sont partagées par tous les rendus. reportlab
+n'embarque dans chaque PDF que les glyphes effectivement utilisés
+(sous-ensemble) ; les sous-ensembles déjà construits sont en outre mis en
+cache, un même modèle réutilisant le plus souvent les mêmes caractères.
+
+DejaVu Sans normal et gras est livrée dans le dossier fonts/ du projet
+(licence fonts/LICENSE) : glyphes, métriques et coupures de ligne ne
+dépendent pas de l'hôte. À défaut seulement (dossier absent), replis
+signalés dans le journal : DejaVu Sans du système, Vera (livrée avec
+reportlab, sans « ◆ »), puis Helvetica (sans sous-ensemble, autres
+métriques).
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+SUBSET_CACHE_SIZE = 128
+
+_FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+
+# (nom de famille, dossiers, fichiers normal / gras / italique / gras italique)
+_CANDIDATES = [
+    ("DejaVuSans", [_FONT_DIR, "/usr/share/fonts/truetype/dejavu", "/usr/share/fonts/dejavu"],
+     ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf", "DejaVuSans-Oblique.ttf", "DejaVuSans-BoldOblique.ttf")),
+    ("Vera", [_FONT_DIR, None],
+     ("Vera.ttf", "VeraBd.ttf", "VeraIt.ttf", "VeraBI.ttf")),
+]
+
+_log = logging.getLogger(__name__)
+_lock = threading.Lock()
+_registered = None
+
+
+def _find(directories, filename):
+    for directory in directories:
+        if directory is None:
+            import reportlab
+            directory = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _cache_subsets(font):
+    """
+    Mémorise les sous-ensembles (octets TTF) construits par la face de la police.
+    Repose sur TTFontFace.makeSubset(subset), interne à reportlab (4.x à 5.0,
+    version bornée dans requirements.txt) : absente, le cache est ignoré.
+    """
+    face = font.face
+    make_subset = getattr(face, "makeSubset", None)
+    if make_subset is None:
+        _log.warning("reportlab %s : sous-ensembles de polices non mis en cache", _reportlab_version())
+        return
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    def cached_make_subset(subset):
+        key = tuple(subset)
+        with lock:
+            data = cache.get(key)
+            if data is not None:
+                cache.move_to_end(key)
+                return data
+        data = make_subset(subset)
+        with lock:
+            cache[key] = data
+            if len(cache) > SUBSET_CACHE_SIZE:
+                cache.popitem(last=False)
+        return data
+
+    face.makeSubset = cached_make_subset
+
+
+def _reportlab_version():
+    import reportlab
+    return reportlab.Version
+
+
+def register_fonts():
+    """
+    Enregistre la famille de police des documents (une fois par processus)
+    et retourne (police normale, police grasse).
+    """
+    global _registered
+    if _registered is not None:
+        return _registered
+    with _lock:
+        if _registered is not None:
+            return _registered
+        from reportlab.lib.fonts import addMapping
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        for family, directories, filenames in _CANDIDATES:
+            paths = [_find(directories, filename) for filename in filenames]
+            if not paths[0] or not paths[1]:
+                continue
+            # Sans variantes italiques, l'italique retombe sur le normal / gras
+            paths[2] = paths[2] or paths[0]
+            paths[3] = paths[3] or paths[1]
+            names = [family, f"{family}-Bold", f"{family}-Italic", f"{family}-BoldItalic"]
+            for name, path in zip(names, paths):
+                font = TTFont(name, path)
+                _cache_subsets(font)
+                pdfmetrics.registerFont(font)
+            # <b> et <i> des paragraphes
+            addMapping(family, 0, 0, names[0])
+            addMapping(family, 1, 0, names[1])
+            addMapping(family, 0, 1, names[2])
+            addMapping(family, 1, 1, names[3])
+            if os.path.dirname(paths[0]) != _FONT_DIR:
+                _log.warning("Police du projet absente de %s : repli sur %s (%s), "
+                             "mise en page et glyphes peuvent différer", _FONT_DIR, family, paths[0])
+            _registered = (names[0], names[1])
+            break
+        else:
+            _log.warning("Aucune police TrueType trouvée : repli sur Helvetica, "
+                         "sans sous-ensemble ni « ◆ »")
+            _registered = ("Helvetica", "Helvetica-Bold")
+    return _registered
+
+
+def font_fingerprints():
+    """
+    {police: SHA-256 du fichier TTF} des polices normale et grasse
+    enregistrées ; « standard » pour une police de base (Helvetica).
+    """
+    from reportlab.pdfbase import pdfmetrics
+
+    fingerprints = {}
+    for name in register_fonts():
+        path = getattr(getattr(pdfmetrics.getFont(name), "face", None), "filename", None)
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                fingerprints[name] = hashlib.sha256(f.read()).hexdigest()
+        else:
+            fingerprints[name] = "standard"
+    return fingerprints
@@ -0,0 +1,219 @@
+"""
+Formatage des montants, dates et montants en lettres (documents et écrans).
+"""
+import datetime
+import numbers
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+
+# Tables fixes, indépendantes de la locale du processus (aucun setlocale :
+# fonctions pures, sûres entre sessions concurrentes)
+MOIS_FR = ("janvier", "février", "mars", "avril", "mai", "juin",
+           "juillet", "août", "septembre", "octobre", "novembre", "décembre")
+
+
+def round_franc(val):
+    """Arrondi à l'unité de fmt_amount ; à passer aussi à amount_to_words pour que chiffres et lettres concordent."""
+    return val if val.__class__ is int else int(round(float(val)))
+
+def fmt_amount(val):
+    """Montant arrondi à l'unité, milliers séparés par une espace : « 1 250 000 »."""
+    if val.__class__ is not int:
+        try:
+            val = round_franc(val)
+        except (TypeError, ValueError, OverflowError):
+            return "0"
+    return f"{val:,}".replace(",", " ")
+
+def fmt_money(val):
+    """Montant avec devise : « 1 250 000 F CFA »."""
+    return fmt_amount(val) + " F CFA"
+
+def format_date_fr(date_obj):
+    """« 1 octobre 2026 », « 19 octobre 2026 » ; accepte aussi une date ISO (AAAA-MM-JJ)."""
+    if isinstance(date_obj, str):
+        date_obj = datetime.date.fromisoformat(date_obj[:10])
+    return f"{date_obj.day} {MOIS_FR[date_obj.month - 1]} {date_obj.year}"
+
+def format_mois_fr(annee, mois):
+    """« octobre 2026 »."""
+    return f"{MOIS_FR[mois - 1]} {annee}"
+
+# ============================
+# MONTANTS EN LETTRES
+# ============================
+# Orthographe traditionnelle : traits d'union sous cent uniquement,
+# « et un » de 21 à 71, « quatre-vingts » et « cents » au pluriel
+# seulement en fin de nombre ou devant million, milliard...
+_UNITES = ["zéro", "un", "deux", "trois", "quatre", "cinq", "six", "sept", "huit", "neuf",
+           "dix", "onze", "douze", "treize", "quatorze", "quinze", "seize",
+           "dix-sept", "dix-huit", "dix-neuf"]
+_DIZAINES = ["", "", "vingt", "trente", "quarante", "cinquante", "soixante",
+             "soixante", "quatre-vingt", "quatre-vingt"]
+# Échelle longue au-delà du milliard : 10^12 billion, 10^15 billiard...
+_ECHELLES = ["", "mille", "million", "milliard", "billion", "billiard", "trillion", "trilliard"]
+
+
+def _below_100(n):
+    if n < 20:
+        return _UNITES[n]
+    dizaine, unite = divmod(n, 10)
+    if dizaine in (7, 9):       # soixante-dix..., quatre-vingt-dix...
+        unite += 10
+    base = _DIZAINES[dizaine]
+    if unite == 0:
+        return "quatre-vingts" if dizaine == 8 else base
+    if unite in (1, 11) and dizaine < 8:
+        return f"{base} et {_UNITES[unite]}"
+    return f"{base}-{_UNITES[unite]}"
+
+
+def _below_1000(n, invariable=False):
+    """Mots de 1 à 999 ; invariable : forme placée devant « mille »."""
+    centaine, reste = divmod(n, 100)
+    if centaine == 0:
+        mots = _below_100(reste)
+        return mots[:-1] if invariable and mots.endswith("quatre-vingts") else mots
+    tete = "cent" if centaine == 1 else f"{_UNITES[centaine]} cent"
+    if reste:
+        fin = _below_100(reste)
+        if invariable and fin.endswith("quatre-vingts"):
+            fin = fin[:-1]
+        return f"{tete} {fin}"
+    return tete + ("s" if centaine > 1 and not invariable else "")
+
+
+# Tables précalculées : (forme finale, forme devant « mille ») pour 0 à 999
+_MOTS = [""] + [_below_1000(n) for n in range(1, 1000)]
+_MOTS_DEVANT_MILLE = [""] + [_below_1000(n, invariable=True) for n in range(1, 1000)]
+MAX_NUMBER_TO_WORDS = 1000 ** len(_ECHELLES) - 1
+
+
+def _integer_words(num, memo=None):
+    """Lettres d'un entier ; memo (dict) réutilise les milliers déjà écrits d'une série."""
+    if num == 0:
+        return "zéro"
+    if num > MAX_NUMBER_TO_WORDS:
+        raise ValueError(f"Montant trop grand pour être écrit en lettres : {num}")
+    haut, bas = divmod(num, 1000)
+    if not haut:
+        return _MOTS[bas]
+    tete = memo.get(haut) if memo is not None else None
+    if tete is None:
+        tete = _thousands_words(haut)
+        if memo is not None:
+            memo[haut] = tete
+    return f"{tete} {_MOTS[bas]}" if bas else tete
+
+
+def _thousands_words(haut):
+    """Lettres de haut × 1000."""
+    mots, rang = [], 1
+    while haut:
+        haut, tranche = divmod(haut, 1000)
+        if tranche:
+            if rang == 1:
+                # « mille » est invariable et ne prend pas « un »
+                mots.append("mille" if tranche == 1 else f"{_MOTS_DEVANT_MILLE[tranche]} mille")
+            else:
+                echelle = _ECHELLES[rang] + ("s" if tranche > 1 else "")
+                mots.append(f"{_MOTS[tranche]} {echelle}")
+        rang += 1
+    return " ".join(reversed(mots))
+
+
+def _plain_number(value):
+    """Scalaires numpy (colonnes pandas) ramenés à int / float : repr(np.float64) n'est pas un nombre."""
+    if value.__class__ is int or value.__class__ is float:
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    return value
+
+
+def _split_centimes(value):
+    """
+    (partie entière, centièmes) d'un montant arrondi au centime. Montant
+    non numérique, infini ou au-delà de MAX_NUMBER_TO_WORDS : ValueError,
+    avant tout arrondi (qui lèverait decimal.InvalidOperation).
+    """
+    if isinstance(value, int):
+        return value, 0
+    try:
+        value = Decimal(repr(value) if isinstance(value, float) else value)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"Montant invalide : {value!r}") from None
+    if not value.is_finite():
+        raise ValueError(f"Montant invalide : {value}")
+    if abs(value) > MAX_NUMBER_TO_WORDS:
+        raise ValueError(f"Montant trop grand pour être écrit en lettres : {value}")
+    cents = int((value * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return divmod(cents, 100) if cents >= 0 else (-(-cents // 100), -(-cents % 100))
+
+
+def number_to_words(num):
+    """
+    Nombre en lettres, avec majuscule initiale. Les décimales sont lues
+    après « virgule » (jusqu'au centième).
+    """
+    num = _plain_number(num)
+    entier, centiemes = _split_centimes(num)
+    if entier < 0 or centiemes < 0:
+        return "Moins " + number_to_words(-num if isinstance(num, int) else -Decimal(str(num))).lower()
+    mots = _integer_words(entier)
+    if centiemes:
+        decimales = _integer_words(centiemes) if centiemes % 10 else _integer_words(centiemes // 10)
+        mots += f" virgule {'zéro ' if centiemes < 10 else ''}{decimales}"
+    return mots[0].upper() + mots[1:]
+
+
+def _singulier(libelle):
+    premier, _, reste = libelle.partition(" ")
+    return (premier[:-1] if premier.endswith("s") else premier) + (f" {reste}" if reste else "")
+
+
+def amount_to_words(montant, devise="francs CFA", subdivision="centimes"):
+    """
+    Montant en lettres avec sa devise, arrondi au centime :
+    « Un million de francs CFA », « Mille deux cents francs CFA et cinquante centimes ».
+    ValueError pour un montant invalide (NaN, infini) ou trop grand.
+    """
+    montant = _plain_number(montant)
+    entier, centimes = _split_centimes(montant)
+    if entier < 0 or centimes < 0:
+        mots = amount_to_words(-Decimal(str(montant)), devise, subdivision)
+        return "Moins " + mots[0].lower() + mots[1:]
+    parties = []
+    if entier or not centimes:
+        # « un million de francs », mais « un million deux cents francs »
+        liaison = " de " if entier >= 10 ** 6 and entier % 10 ** 6 == 0 else " "
+        parties.append(_integer_words(entier) + liaison + (devise if entier > 1 else _singulier(devise)))
+    if centimes:
+        parties.append(f"{_integer_words(centimes)} "
+                       f"{subdivision if centimes > 1 else _singulier(subdivision)}")
+    mots = " et ".join(parties)
+    return mots[0].upper() + mots[1:]
+
+
+def numbers_to_words(values):
+    """
+    number_to_words sur une série (bordereaux, lots) : les valeurs répétées
+    et les milliers communs (montants ronds) ne sont écrits qu'une fois.
+    """
+    memo, resultat = {}, []
+    for value in map(_plain_number, values):
+        if isinstance(value, int) and value >= 0:
+            mots = _integer_words(value, memo)
+            resultat.append(mots[0].upper() + mots[1:])
+        else:
+            resultat.append(number_to_words(value))
+    return resultat
+
+
+def amounts_to_words(values, devise="francs CFA", subdivision="centimes"):
+    """amount_to_words sur une série ; chaque valeur distincte n'est écrite qu'une fois."""
+    mots = {}
+    return [mots[v] if v in mots else mots.setdefault(v, amount_to_words(v, devise, subdivision))
+            for v in map(_plain_number, values)]
@@ -0,0 +1,296 @@
+"""
+File des travaux de génération documentaire : priorités, plafonds par
+utilisateur, suivi de progression et annulation.
+
+Priorités : cotation interactive > contrat > traitements par lot (actes
+par lot, bordereau, export). Les créneaux d'exécution sont bornés ; une
+partie est réservée aux travaux interactifs (cotations et contrats), qu'un
+afflux de traitements par lot ne peut donc pas retarder. Chaque utilisateur (jeton de session) a un nombre
+borné de travaux en cours et en attente : au-delà, la demande est
+refusée (AdmissionRefused) plutôt que mise en file sans limite.
+
+Un travail est une fonction func(job, ...) exécutée sur un fil dédié.
+job.report(fait, total) publie la progression et sert de point
+d'annulation : après job.cancel(), l'appel suivant lève JobCancelled.
+Un travail en attente annulé n'est jamais lancé.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import streamlit as st
+
+PRIORITIES = {"cotation": 0, "contrat": 1, "actes": 2, "bordereau": 2, "export": 2}
+BATCH = 2               # priorité à partir de laquelle un travail est un traitement par lot
+LABELS = {"cotation": "Cotation", "contrat": "Contrat", "actes": "Actes par lot",
+          "bordereau": "Bordereau", "export": "Export"}
+
+EN_ATTENTE, EN_COURS, TERMINE, ANNULE, ECHEC = "En attente", "En cours", "Terminé", "Annulé", "Échec"
+FINISHED = (TERMINE, ANNULE, ECHEC)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class AdmissionRefused(Exception):
+    pass
+
+
+class Job:
+
+    def __init__(self, owner, kind, func, args, kwargs, label=None):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.kind = kind
+        self.priority = PRIORITIES[kind]
+        self.label = label or LABELS[kind]
+        self.state = EN_ATTENTE
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.created = time.monotonic()
+        self.started = self.finished = None
+        self._func, self._args, self._kwargs = func, args, kwargs
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def fraction(self):
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(self, done, total=None):
+        """Progression (appelée par le travail) ; point d'annulation."""
+        self.done = done
+        if total is not None:
+            self.total = total
+        self.check()
+
+    def wait(self, timeout=None):
+        """Résultat du travail ; relève son erreur, JobCancelled s'il a été annulé."""
+        if not self._finished.wait(timeout):
+            raise TimeoutError(f"{self.label} : toujours {self.state.lower()}")
+        if self.state == ANNULE:
+            raise JobCancelled()
+        if self.state == ECHEC:
+            raise self.error
+        return self.result
+
+
+class DocumentQueue:
+    """
+    max_running travaux simultanés au plus, dont reserved_interactive
+    créneaux que les traitements par lot ne peuvent pas occuper (cotations
+    et contrats) ; par utilisateur, per_owner en cours
+    et max_per_owner en cours ou en attente ; max_queued en attente au plus
+    pour les traitements par lot.
+    """
+
+    def __init__(self, max_running=4, reserved_interactive=1, per_owner=2, max_per_owner=4,
+                 max_queued=50, retention_seconds=900):
+        self.max_running = max_running
+        self.reserved_interactive = min(reserved_interactive, max_running - 1)
+        self.per_owner = per_owner
+        self.max_per_owner = max_per_owner
+        self.max_queued = max_queued
+        self.retention_seconds = retention_seconds
+        self._jobs = {}
+        self._heap = []             # (priorité, n° d'arrivée, job)
+        self._counter = itertools.count()
+        self._running = []
+        self._lock = threading.Lock()
+
+    def submit(self, owner, kind, func, *args, label=None, **kwargs):
+        job = Job(owner, kind, func, args, kwargs, label)
+        with self._lock:
+            self._purge()
+            active = [j for j in self._jobs.values() if j.owner == owner and j.state not in FINISHED]
+            if len(active) >= self.max_per_owner:
+                raise AdmissionRefused(f"{len(active)} travaux déjà en cours ou en attente pour cette session.")
+            queued = sum(1 for j in self._jobs.values() if j.state == EN_ATTENTE)
+            if job.priority >= BATCH and queued >= self.max_queued:
+                raise AdmissionRefused("File de génération saturée, réessayez dans quelques instants.")
+            self._jobs[job.id] = job
+            heapq.heappush(self._heap, (job.priority, next(self._counter), job))
+            self._dispatch()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        with self._lock:
+            return sorted((j for j in self._jobs.values() if owner is None or j.owner == owner),
+                          key=lambda j: j.created)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.state in FINISHED:
+            return False
+        job.cancel()
+        with self._lock:
+            if job.state == EN_ATTENTE:
+                self._finish(job, ANNULE)
+                self._dispatch()
+        return True
+
+    def position(self, job):
+        """Rang dans la file (1 = prochain lancé), None s'il n'attend plus."""
+        with self._lock:
+            if job.state != EN_ATTENTE:
+                return None
+            waiting = sorted((p, n) for p, n, j in self._heap if j.state == EN_ATTENTE)
+            return waiting.index(next((p, n) for p, n, j in self._heap if j is job)) + 1
+
+    def stats(self):
+        with self._lock:
+            states = [j.state for j in self._jobs.values()]
+            return {state: states.count(state) for state in (EN_ATTENTE, EN_COURS, TERMINE, ANNULE, ECHEC)}
+
+    # Sous verrou
+    def _eligible(self, job):
+        if len(self._running) >= self.max_running:
+            return False
+        if job.priority >= BATCH:
+            batch = sum(1 for j in self._running if j.priority >= BATCH)
+            if batch >= self.max_running - self.reserved_interactive:
+                return False
+        return sum(1 for j in self._running if j.owner == job.owner) < self.per_owner
+
+    def _dispatch(self):
+        skipped = []
+        while self._heap and len(self._running) < self.max_running:
+            entry = heapq.heappop(self._heap)
+            job = entry[2]
+            if job.state != EN_ATTENTE:
+                continue
+            if not self._eligible(job):
+                skipped.append(entry)
+                continue
+            job.state = EN_COURS
+            job.started = time.monotonic()
+            self._running.append(job)
+            threading.Thread(target=self._run, args=(job,), name=f"job-{job.kind}-{job.id[:8]}",
+                             daemon=True).start()
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+
+    def _finish(self, job, state):
+        job.state = state
+        job.finished = time.monotonic()
+        job._func = job._args = job._kwargs = None
+        job._finished.set()
+
+    def _purge(self):
+        limit = time.monotonic() - self.retention_seconds
+        for job_id in [i for i, j in self._jobs.items() if j.state in FINISHED and j.finished < limit]:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        try:
+            job.check()
+            job.result = job._func(job, *job._args, **job._kwargs)
+            state = TERMINE
+        except JobCancelled:
+            state = ANNULE
+        except Exception as e:
+            job.error = e
+            state = ECHEC
+        with self._lock:
+            self._running.remove(job)
+            self._finish(job, state)
+            self._dispatch()
+
+
+def run_bounded(job, executor, func, items, max_in_flight):
+    """
+    func(item) sur le pool de processus, au plus max_in_flight à la fois :
+    la file du pool reste courte, les processus restants répondent aux
+    travaux interactifs. Progression et annulation entre deux éléments.
+    Retourne les résultats dans l'ordre d'items.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    pending = {}
+    next_index = 0
+    job.report(0, len(items))
+    try:
+        while next_index < len(items) or pending:
+            while next_index < len(items) and len(pending) < max_in_flight:
+                pending[executor.submit(func, items[next_index])] = next_index
+                next_index += 1
+            finished, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            for future in finished:
+                results[pending.pop(future)] = future.result()
+            job.report(sum(r is not None for r in results))
+    finally:
+        for future in pending:
+            future.cancel()
+    return results
+
+
+def session_owner():
+    """Propriétaire des travaux : jeton de session de l'application, à défaut un identifiant de session."""
+    if "job_owner" not in st.session_state:
+        st.session_state.job_owner = st.session_state.get("session_token") or uuid.uuid4().hex
+    return st.session_state.job_owner
+
+
+@st.cache_resource
+def init_document_queue():
+    """File partagée par toutes les sessions et pages du processus."""
+    return DocumentQueue(
+        max_running=int(st.secrets.get("DOCUMENT_JOBS_MAX", 4)),
+        reserved_interactive=int(st.secrets.get("DOCUMENT_JOBS_RESERVE_COTATION", 1)),
+        per_owner=int(st.secrets.get("DOCUMENT_JOBS_PAR_SESSION", 2)),
+        max_per_owner=int(st.secrets.get("DOCUMENT_JOBS_FILE_PAR_SESSION", 4)),
+        max_queued=int(st.secrets.get("DOCUMENT_JOBS_FILE_MAX", 50)),
+    )
+
+
+def remove_expired_files(directory, max_age_seconds):
+    """
+    Fichiers produits par les travaux (bordereaux, exports) : supprime ceux
+    de plus de max_age_seconds et les dossiers vidés ; retourne le nombre
+    de fichiers supprimés.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    limit = time.time() - max_age_seconds
+    removed = 0
+    for root, _, files in os.walk(directory, topdown=False):
+        # Un dossier récent peut attendre le premier fichier de son travail
+        try:
+            expired = root != directory and os.path.getmtime(root) < limit
+        except OSError:
+            continue
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass        # supprimé entre-temps par une autre session
+        try:
+            if expired:
+                os.rmdir(root)
+        except OSError:
+            pass            # pas encore vide
+    return removed
@@ -0,0 +1,106 @@
+"""
+Actes individuels par lot : pour un marché alloti, un document par entrée
+de lots_data (montant du lot, montant en lettres et décompte de prime au
+prorata), rendus en parallèle sur un pool de processus puis livrés en
+archive zip et, au besoin, fusionnés en un seul PDF. Les actes de contrat
+peuvent être signés dans le même processus de travail, juste après leur
+rendu (signing.sign_document : clé chargée une fois par processus).
+
+Le rendu reportlab est lié au CPU et tient le GIL : seuls des processus
+permettent un débit proportionnel au nombre de cœurs.
+"""
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+PRIME_KEYS = ["prime_nette", "accessoires", "frais_analyse", "taxes", "prime_ttc"]
+
+FILE_PREFIX = {"cotation": "Cotation", "contrat": "Contrat", "agrement": "Contrat_Agrement"}
+
+
+def lot_data(data, lot, montant_total):
+    """Données du document d'un lot : montant du lot, prime au prorata de sa part."""
+    montant = float(lot.get("Montant") or 0)
+    part = montant / montant_total if montant_total else 0.0
+    lot_ref = lot.get("Lot", "")
+    designation = lot.get("Désignation", "")
+    objet = data.get("objet", "")
+    return {
+        **data,
+        **{key: round(float(data.get(key) or 0) * part) for key in PRIME_KEYS},
+        "montant_caution": montant,
+        "lot": lot_ref,
+        "objet": f"{objet} – Lot {lot_ref}" + (f" : {designation}" if designation else ""),
+    }
+
+
+def render_lot(job):
+    """Exécuté dans un processus de travail : (nom de fichier, octets PDF)."""
+    from pdf_documents import generate_caution_pdf, generate_contrat_pdf, generate_contrat_agrement_pdf
+
+    kind, data, lot = job["kind"], job["data"], job["lot"]
+    if kind == "cotation":
+        buffer = generate_caution_pdf(data, [lot])
+    elif kind == "agrement":
+        buffer = generate_contrat_agrement_pdf(data, job["detail_agrement"], [lot])
+    else:
+        buffer = generate_contrat_pdf(data, [lot])
+    pdf = buffer.getvalue()
+    if job.get("signature"):
+        from signing import sign_document
+        pdf = sign_document(pdf, job["signature"])
+    reference = data.get("police_num") or data.get("num_marche") or "document"
+    nom = f"{FILE_PREFIX[kind]}_{reference}_Lot_{data['lot']}.pdf".replace("/", "-").replace(" ", "_")
+    return nom, pdf
+
+
+def generate_lot_documents(kind, data, lots_data, detail_agrement=None, executor=None, workers=None,
+                           job=None, max_in_flight=None, signature=None):
+    """
+    Un document par lot, dans l'ordre de lots_data ; retourne [(nom, octets)].
+    kind : "cotation", "contrat" ou "agrement". Un executor existant (pool
+    partagé) évite de relancer les processus à chaque appel.
+    Depuis la file des travaux (job) : progression, annulation, et au plus
+    max_in_flight rendus soumis à la fois au pool.
+    signature : configuration de signing.sign_document, chaque acte est
+    alors signé dans le processus qui l'a rendu.
+    """
+    if kind not in FILE_PREFIX:
+        raise ValueError(f"Type de document inconnu : {kind}")
+    montant_total = sum(float(lot.get("Montant") or 0) for lot in lots_data)
+    jobs = [{"kind": kind, "data": lot_data(data, lot, montant_total), "lot": lot,
+             "detail_agrement": detail_agrement, "signature": signature} for lot in lots_data]
+    if executor is not None:
+        return _render_all(executor, jobs, job, max_in_flight)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _render_all(pool, jobs, job, max_in_flight)
+
+
+def _render_all(executor, jobs, job, max_in_flight):
+    if job is None:
+        return list(executor.map(render_lot, jobs))
+    from jobs import run_bounded
+    return run_bounded(job, executor, render_lot, jobs, max_in_flight or len(jobs))
+
+
+def bundle_zip(documents):
+    """Archive zip des documents (PDF déjà compressés : stockés tels quels)."""
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for nom, pdf in documents:
+            archive.writestr(nom, pdf)
+    buffer.seek(0)
+    return buffer
+
+
+def merge_documents(documents):
+    """Un seul PDF, les documents à la suite, avec un signet par lot."""
+    from dossier import assemble_dossier
+
+    return assemble_dossier([(nom.rsplit(".", 1)[0], pdf) for nom, pdf in documents])
+
+
+def check_montants(data, lots_data):
+    """Les lots doivent couvrir exactement le montant cautionné ; retourne l'écart."""
+    montant_total = sum(float(lot.get("Montant") or 0) for lot in lots_data)
+    return float(data.get("montant_caution") or 0) - montant_total
@@ -0,0 +1,124 @@
+import streamlit as st
+
+from supabase_client import init_supabase_client
+from referentiel import TYPES_CAUTION, STATUTS_COTATION
+from cotation_history import fetch_history_page, fetch_cotation_details
+
+# ============================
+# CONFIG
+# ============================
+st.set_page_config(page_title="Historique - Caution Leadway", page_icon="briefcase", layout="wide")
+PAGE_SIZE = 50
+
+supabase = init_supabase_client()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_history_page(filters, cursor):
+    return fetch_history_page(supabase, filters, cursor, PAGE_SIZE)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_cotation_details(cotation_id):
+    return fetch_cotation_details(supabase, cotation_id)
+
+# ============================
+# UI STREAMLIT
+# ============================
+st.markdown("<h1 style='text-align:center;color:#000;'>Historique des cotations</h1>", unsafe_allow_html=True)
+st.markdown("<hr>", unsafe_allow_html=True)
+
+with st.form("filtres_historique"):
+    c1, c2, c3, c4 = st.columns(4)
+    f_assure = c1.text_input("Assuré")
+    f_num_marche = c2.text_input("Numéro du marché")
+    f_couverture = c3.selectbox("Couverture", ["Toutes"] + TYPES_CAUTION)
+    f_statut = c4.selectbox("Statut", ["Tous"] + STATUTS_COTATION)
+    c5, c6, _ = st.columns([1, 1, 2])
+    f_debut = c5.date_input("Du", value=None)
+    f_fin = c6.date_input("Au", value=None)
+    rechercher = st.form_submit_button("Rechercher", type="primary")
+
+filters = {
+    "assure": f_assure.strip(),
+    "num_marche": f_num_marche.strip(),
+    "couverture": f_couverture if f_couverture != "Toutes" else None,
+    "statut": f_statut if f_statut != "Tous" else None,
+    "date_debut": f_debut,
+    "date_fin": f_fin,
+}
+
+# Pile des curseurs : un curseur par page déjà visitée (pagination par clé, sans OFFSET)
+if rechercher or st.session_state.get("history_filters") != filters:
+    st.session_state.history_filters = filters
+    st.session_state.history_cursors = [None]
+
+cursors = st.session_state.history_cursors
+try:
+    rows, next_cursor = load_history_page(filters, cursors[-1])
+except Exception as e:
+    st.error(f"Erreur Supabase (historique): {e}")
+    st.stop()
+
+if not rows:
+    st.info("Aucune cotation ne correspond à ces critères.")
+    st.stop()
+
+table = [{
+    "ID": row["id"],
+    "Date": row.get("date_cotation") or str(row.get("created_at", ""))[:10],
+    "Assuré": row.get("assure"),
+    "N° marché": row.get("num_marche"),
+    "Couverture": row.get("couverture"),
+    "Montant caution": row.get("montant_caution") or 0,
+    "Prime TTC": row.get("prime_ttc") or 0,
+    "Statut": row.get("statut"),
+} for row in rows]
+
+selection = st.dataframe(
+    table, hide_index=True, use_container_width=True,
+    on_select="rerun", selection_mode="single-row",
+    column_config={
+        "Montant caution": st.column_config.NumberColumn(format="%.0f F CFA"),
+        "Prime TTC": st.column_config.NumberColumn(format="%.0f F CFA"),
+    },
+)
+
+p1, p2, p3 = st.columns([1, 2, 1])
+if p1.button("Page précédente", disabled=len(cursors) == 1, use_container_width=True):
+    cursors.pop()
+    st.rerun()
+p2.markdown(f"<p style='text-align:center;'>Page {len(cursors)}</p>", unsafe_allow_html=True)
+if p3.button("Page suivante", disabled=next_cursor is None, use_container_width=True):
+    cursors.append(next_cursor)
+    st.rerun()
+
+# Détails chargés uniquement pour la ligne sélectionnée
+if selection.selection.rows:
+    row = rows[selection.selection.rows[0]]
+    st.markdown(f"### <span style='color:#8B00FF;'>Cotation {row['id']} – {row.get('assure')}</span>",
+                unsafe_allow_html=True)
+    try:
+        details = load_cotation_details(row["id"])
+    except Exception as e:
+        st.error(f"Erreur Supabase (détails): {e}")
+        st.stop()
+
+    d1, d2 = st.columns(2)
+    with d1:
+        st.markdown("**Lots**")
+        if details["lots"]:
+            st.dataframe([{"Lot": lot.get("lot_num"), "Montant": lot.get("montant"),
+                           "Désignation": lot.get("designation")} for lot in details["lots"]],
+                         hide_index=True, use_container_width=True)
+        else:
+            st.caption("Aucun lot.")
+    with d2:
+        st.markdown("**Police**")
+        if details["polices"]:
+            police = details["polices"][0]
+            st.markdown(f"- Numéro : **{police.get('police_num')}**\n"
+                        f"- Émission : {police.get('date_emission')}\n"
+                        f"- Effet : {police.get('date_effet')}\n"
+                        f"- Échéance : {police.get('date_echeance')}\n"
+                        f"- Durée : {police.get('duree_police')}")
+        else:
+            st.caption("Cotation non contractualisée.")
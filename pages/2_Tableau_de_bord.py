@@ -0,0 +1,80 @@
+import streamlit as st
+
+from supabase_client import init_supabase_client
+from formatting import fmt_money
+
+# ============================
+# CONFIG
+# ============================
+st.set_page_config(page_title="Portefeuille - Caution Leadway", page_icon="briefcase", layout="wide")
+TOP_ASSURES = 20
+
+supabase = init_supabase_client()
+
+# Les agrégats sont calculés en base (vues matérialisées, cf.
+# supabase/migrations/20261019100000_portfolio_aggregates.sql) : chaque lecture
+# renvoie quelques lignes, quelle que soit la taille du portefeuille.
+@st.cache_data(ttl=60, show_spinner=False)
+def load_encours_couverture():
+    return supabase.table('mv_encours_couverture').select('*') \
+                   .order('montant_caution', desc=True).execute().data or []
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_encours_assures(limit):
+    return supabase.table('mv_encours_assure').select('*') \
+                   .order('montant_caution', desc=True).limit(limit).execute().data or []
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_production_mensuelle():
+    return supabase.table('mv_production_mensuelle').select('*') \
+                   .order('mois').execute().data or []
+
+# ============================
+# UI STREAMLIT
+# ============================
+st.markdown("<h1 style='text-align:center;color:#000;'>Portefeuille Caution</h1>", unsafe_allow_html=True)
+st.markdown("<hr>", unsafe_allow_html=True)
+
+try:
+    couvertures = load_encours_couverture()
+    assures = load_encours_assures(TOP_ASSURES)
+    production = load_production_mensuelle()
+except Exception as e:
+    st.error(f"Erreur Supabase (portefeuille): {e}")
+    st.stop()
+
+k1, k2, k3 = st.columns(3)
+k1.metric("Encours cautionné", fmt_money(sum(float(r["montant_caution"]) for r in couvertures)))
+k2.metric("Primes TTC en cours", fmt_money(sum(float(r["prime_ttc"]) for r in couvertures)))
+k3.metric("Polices en cours", sum(r["nb_polices"] for r in couvertures))
+
+st.markdown("### <span style='color:#8B00FF;'>Encours par couverture</span>", unsafe_allow_html=True)
+if couvertures:
+    st.bar_chart({r["couverture"]: float(r["montant_caution"]) for r in couvertures})
+    st.dataframe([{"Couverture": r["couverture"], "Polices": r["nb_polices"],
+                   "Montant caution": float(r["montant_caution"]), "Prime TTC": float(r["prime_ttc"])}
+                  for r in couvertures],
+                 hide_index=True, use_container_width=True,
+                 column_config={"Montant caution": st.column_config.NumberColumn(format="%.0f F CFA"),
+                                "Prime TTC": st.column_config.NumberColumn(format="%.0f F CFA")})
+else:
+    st.info("Aucune police en cours.")
+
+st.markdown("### <span style='color:#8B00FF;'>Production mensuelle</span>", unsafe_allow_html=True)
+if production:
+    par_mois = {}
+    for r in production:
+        mois = str(r["mois"])[:7]
+        par_mois.setdefault(mois, {})[r["couverture"]] = float(r["montant_caution"])
+    st.bar_chart([{"Mois": mois, **valeurs} for mois, valeurs in par_mois.items()], x="Mois", stack=True)
+else:
+    st.info("Aucune police émise.")
+
+st.markdown(f"### <span style='color:#8B00FF;'>{TOP_ASSURES} premiers assurés (encours)</span>",
+            unsafe_allow_html=True)
+st.dataframe([{"Assuré": r["assure"], "Polices": r["nb_polices"],
+               "Montant caution": float(r["montant_caution"]), "Prime TTC": float(r["prime_ttc"])}
+              for r in assures],
+             hide_index=True, use_container_width=True,
+             column_config={"Montant caution": st.column_config.NumberColumn(format="%.0f F CFA"),
+                            "Prime TTC": st.column_config.NumberColumn(format="%.0f F CFA")})
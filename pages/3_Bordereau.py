@@ -0,0 +1,103 @@
+import datetime
+import os
+import time
+import uuid
+import streamlit as st
+
+from supabase_client import create_supabase_client
+from bordereau import generate_bordereau
+from formatting import MOIS_FR, fmt_money
+from jobs import (init_document_queue, session_owner, remove_expired_files, AdmissionRefused,
+                  EN_ATTENTE, EN_COURS, ANNULE, ECHEC, FINISHED)
+
+# ============================
+# CONFIG
+# ============================
+st.set_page_config(page_title="Bordereau - Caution Leadway", page_icon="briefcase", layout="wide")
+OUTPUT_DIR = "bordereaux"
+RETENTION_SECONDS = float(st.secrets.get("DOCUMENT_FICHIERS_RETENTION_HEURES", 24)) * 3600
+
+# Travaux lancés : (session, année, mois) -> travail. Le dictionnaire est
+# partagé par le processus ; chaque session ne voit et n'annule que les siens.
+@st.cache_resource
+def bordereau_jobs():
+    return {}
+
+document_queue = init_document_queue()
+
+def oublier_expires(jobs):
+    """Fichiers et travaux terminés au-delà de la durée de conservation."""
+    remove_expired_files(OUTPUT_DIR, RETENTION_SECONDS)
+    limite = time.monotonic() - RETENTION_SECONDS
+    for key, job in list(jobs.items()):
+        if job.state in FINISHED and job.finished < limite:
+            jobs.pop(key, None)
+
+def lancer_bordereau(jobs, key, annee, mois):
+    # Un dossier par travail : deux sessions ne réécrivent pas le même fichier
+    output_dir = os.path.join(OUTPUT_DIR, uuid.uuid4().hex)
+
+    def run(job):
+        # job.report : progression et point d'annulation, à chaque page lue
+        return generate_bordereau(create_supabase_client(), annee, mois, output_dir, job.report)
+
+    try:
+        jobs[key] = document_queue.submit(session_owner(), "bordereau", run,
+                                          label=f"Bordereau {MOIS_FR[mois - 1]} {annee}")
+    except AdmissionRefused as e:
+        st.warning(f"Bordereau refusé : {e}")
+
+def lire_fichier(path):
+    def read():
+        with open(path, "rb") as f:
+            return f.read()
+    return read
+
+# ============================
+# UI STREAMLIT
+# ============================
+st.markdown("<h1 style='text-align:center;color:#000;'>Bordereau mensuel de production</h1>", unsafe_allow_html=True)
+st.markdown("<hr>", unsafe_allow_html=True)
+
+jobs = bordereau_jobs()
+oublier_expires(jobs)
+today = datetime.date.today()
+c1, c2, c3 = st.columns([1, 1, 1])
+annee = c1.number_input("Année", min_value=2020, max_value=today.year, value=today.year, step=1)
+mois = c2.selectbox("Mois", range(1, 13), index=today.month - 1, format_func=lambda m: MOIS_FR[m - 1])
+c3.markdown("<br>", unsafe_allow_html=True)
+job_key = (session_owner(), int(annee), int(mois))
+en_cours = job_key in jobs and jobs[job_key].state not in FINISHED
+if c3.button("Générer le bordereau", type="primary", use_container_width=True, disabled=en_cours):
+    lancer_bordereau(jobs, job_key, int(annee), int(mois))
+
+@st.fragment(run_every=2)
+def suivi_bordereau():
+    job = jobs.get(job_key)
+    if not job:
+        return
+    if job.state in (EN_ATTENTE, EN_COURS):
+        s1, s2 = st.columns([4, 1])
+        if job.state == EN_ATTENTE:
+            s1.info(f"En attente (position {document_queue.position(job) or 1} dans la file)")
+        else:
+            s1.progress(job.fraction, text=f"{job.done} / {job.total or '…'} polices")
+        if s2.button("Annuler", use_container_width=True):
+            document_queue.cancel(job.id)
+    elif job.state == ANNULE:
+        st.info("Bordereau annulé.")
+    elif job.state == ECHEC:
+        st.error(f"Échec du bordereau : {job.error}")
+    elif not os.path.exists(job.result["pdf_path"]):
+        st.info("Bordereau expiré : générez-le à nouveau.")
+    else:
+        resultat = job.result
+        st.success(f"{resultat['lignes']} polices – prime TTC {fmt_money(resultat['totaux']['prime_ttc'])}")
+        d1, d2 = st.columns(2)
+        nom = f"Bordereau_{job_key[1]}_{job_key[2]:02d}"
+        d1.download_button("Télécharger le PDF", lire_fichier(resultat["pdf_path"]),
+                           f"{nom}.pdf", "application/pdf", use_container_width=True)
+        d2.download_button("Télécharger le CSV", lire_fichier(resultat["csv_path"]),
+                           f"{nom}.csv", "text/csv", use_container_width=True)
+
+suivi_bordereau()
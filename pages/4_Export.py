@@ -0,0 +1,133 @@
+import datetime
+import os
+import time
+import uuid
+import streamlit as st
+
+from supabase_client import create_supabase_client
+from export import export_to_file, export_url
+from jobs import (init_document_queue, session_owner, remove_expired_files, AdmissionRefused,
+                  EN_ATTENTE, EN_COURS, ANNULE, ECHEC, FINISHED)
+
+# ============================
+# CONFIG
+# ============================
+st.set_page_config(page_title="Export - Caution Leadway", page_icon="briefcase", layout="wide")
+OUTPUT_DIR = "exports"
+# Service `python export.py serve` : le fichier est envoyé en flux chunked, sans passer par l'app,
+# sur un lien signé (clé partagée EXPORT_SECRET) valable 15 minutes
+EXPORT_SERVICE_URL = st.secrets.get("EXPORT_SERVICE_URL", "")
+EXPORT_SECRET = st.secrets.get("EXPORT_SECRET", "")
+# Sans ce service, le fichier est lu en mémoire de l'app pour le téléchargement : taille bornée
+TELECHARGEMENT_MAX_OCTETS = float(st.secrets.get("EXPORT_TELECHARGEMENT_MAX_MO", 50)) * 1_048_576
+RETENTION_SECONDS = float(st.secrets.get("DOCUMENT_FICHIERS_RETENTION_HEURES", 24)) * 3600
+MIME = {"csv": "text/csv",
+        "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"}
+
+# Exports lancés : (session, format, du, au) -> (travail, fichier). Le dictionnaire
+# est partagé par le processus ; chaque session ne voit et n'annule que les siens.
+@st.cache_resource
+def export_jobs():
+    return {}
+
+document_queue = init_document_queue()
+
+def oublier_expires(jobs):
+    """Fichiers et travaux terminés au-delà de la durée de conservation."""
+    remove_expired_files(OUTPUT_DIR, RETENTION_SECONDS)
+    limite = time.monotonic() - RETENTION_SECONDS
+    for key, (job, _) in list(jobs.items()):
+        if job.state in FINISHED and job.finished < limite:
+            jobs.pop(key, None)
+
+def lancer_export(jobs, key, fmt, debut, fin):
+    # Un dossier par travail : deux sessions n'écrivent pas dans le même fichier
+    nom = f"Export_{debut.isoformat()}_{fin.isoformat()}.{fmt}"
+    path = os.path.join(OUTPUT_DIR, uuid.uuid4().hex, nom)
+
+    def run(job):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        def progress(lues):
+            # job.report : point d'annulation avant chaque page de cotations lue
+            job.report(lues)
+            if os.path.exists(path) and os.path.getsize(path) > TELECHARGEMENT_MAX_OCTETS:
+                raise ValueError(f"plus de {TELECHARGEMENT_MAX_OCTETS / 1_048_576:.0f} Mo, "
+                                 f"trop volumineux pour être téléchargé depuis l'application ; "
+                                 f"réduisez la période ou configurez le service d'export")
+
+        return {"path": path, "taille": export_to_file(create_supabase_client(), fmt, debut, fin, path,
+                                                         progress)}
+
+    try:
+        jobs[key] = document_queue.submit(session_owner(), "export", run, label=nom), path
+    except AdmissionRefused as e:
+        st.warning(f"Export refusé : {e}")
+
+def lire_fichier(path):
+    def read():
+        with open(path, "rb") as f:
+            return f.read()
+    return read
+
+# ============================
+# UI STREAMLIT
+# ============================
+st.markdown("<h1 style='text-align:center;color:#000;'>Export du portefeuille</h1>", unsafe_allow_html=True)
+st.markdown("<hr>", unsafe_allow_html=True)
+st.caption("Cotations, lots et polices à plat : une ligne par lot, selon la date de création de la cotation.")
+
+jobs = export_jobs()
+oublier_expires(jobs)
+today = datetime.date.today()
+c1, c2, c3, c4 = st.columns([1, 1, 1, 1])
+debut = c1.date_input("Du", value=today.replace(month=1, day=1), format="DD/MM/YYYY")
+fin = c2.date_input("Au", value=today, format="DD/MM/YYYY")
+fmt = c3.selectbox("Format", ["csv", "xlsx"], format_func=str.upper)
+c4.markdown("<br>", unsafe_allow_html=True)
+job_key = (session_owner(), fmt, debut, fin)
+en_cours = job_key in jobs and jobs[job_key][0].state not in FINISHED
+
+if debut > fin:
+    st.error("La date de début doit précéder la date de fin.")
+    st.stop()
+
+if EXPORT_SERVICE_URL and EXPORT_SECRET:
+    c4.link_button("Télécharger", export_url(EXPORT_SERVICE_URL, fmt, debut, fin, EXPORT_SECRET),
+                   type="primary", use_container_width=True)
+elif c4.button("Préparer l'export", type="primary", use_container_width=True, disabled=en_cours):
+    lancer_export(jobs, job_key, fmt, debut, fin)
+
+@st.fragment(run_every=2)
+def suivi_export():
+    job, path = jobs.get(job_key, (None, None))
+    if not job:
+        return
+    if job.state == EN_ATTENTE:
+        s1, s2 = st.columns([4, 1])
+        s1.info(f"Export en attente (position {document_queue.position(job) or 1} dans la file)")
+        if s2.button("Annuler", use_container_width=True):
+            document_queue.cancel(job.id)
+    elif job.state == EN_COURS:
+        taille = os.path.getsize(path) if os.path.exists(path) else 0
+        s1, s2 = st.columns([4, 1])
+        s1.info(f"Export en cours… {job.done} cotations lues, {taille / 1_048_576:.1f} Mo écrits")
+        if s2.button("Annuler", use_container_width=True):
+            document_queue.cancel(job.id)
+    elif job.state == ANNULE:
+        st.info("Export annulé.")
+    elif job.state == ECHEC:
+        st.error(f"Échec de l'export : {job.error}")
+    elif not os.path.exists(path):
+        st.info("Export expiré : préparez-le à nouveau.")
+    elif job.result["taille"] > TELECHARGEMENT_MAX_OCTETS:
+        st.warning(f"Export de {job.result['taille'] / 1_048_576:.1f} Mo : trop volumineux pour être "
+                   f"téléchargé depuis l'application (au-delà de "
+                   f"{TELECHARGEMENT_MAX_OCTETS / 1_048_576:.0f} Mo). Configurez le service d'export "
+                   f"(EXPORT_SERVICE_URL, EXPORT_SECRET) ou réduisez la période.")
+    else:
+        st.download_button(f"Télécharger ({job.result['taille'] / 1_048_576:.1f} Mo)",
+                           lire_fichier(path), os.path.basename(path),
+                           MIME[fmt], use_container_width=True)
+
+suivi_export()
@@ -0,0 +1,318 @@
+"""
+Équivalence sémantique des PDF générés, pour sécuriser les optimisations
+des générateurs (cache, gabarits, pré-rendu...).
+
+Un document est réduit à ce qui engage : nombre de pages, segments de
+texte positionnés (lignes de paragraphe et cellules de tableau, donc
+clauses et montants) et emplacements des images. L'extraction passe par
+pdfium, indépendamment de la façon dont reportlab a écrit les flux : deux
+rendus équivalents donnent le même instantané même si les octets
+diffèrent (compression, ordre des objets, sous-ensembles de police).
+
+Les instantanés de référence (golden/) couvrent une matrice de jeux
+d'essai : chaque type de caution, avec et sans lots (pour les types qui
+en ont), avec et sans sûretés, pour la cotation et le contrat. La date du
+jour imprimée par les générateurs est remplacée par {DATE}. Chaque
+instantané enregistre aussi la police et l'empreinte SHA-256 de ses
+fichiers (fonts/) : un rendu fait avec une autre police est signalé
+« mauvaise police », sans comparaison de contenu.
+
+Usage :
+    python pdf_equivalence.py snapshot            # (ré)écrit golden/
+    python pdf_equivalence.py verifier [--optimiser] [--images-strictes]
+                                                  # code retour 1 si écart
+    python pdf_equivalence.py comparer avant.pdf apres.pdf
+"""
+import argparse
+import datetime
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from formatting import format_date_fr
+from referentiel import TYPES_CAUTION, TYPES_SANS_LOTS
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+TOLERANCE_PT = 1.0
+DATE_TOKEN = "{DATE}"
+MAX_ECARTS = 20
+
+FIXTURE_DATA = {
+    "assure": "SOCIÉTÉ IVOIRIENNE DE TRAVAUX PUBLICS",
+    "souscripteur": "SOCIÉTÉ IVOIRIENNE DE TRAVAUX PUBLICS",
+    "beneficiaire": "MINISTÈRE DE L'ÉQUIPEMENT ET DE L'ENTRETIEN ROUTIER",
+    "adresse": "Abidjan Plateau, 01 BP 1234 Abidjan 01",
+    "adresse_beneficiaire": "Abidjan Plateau, Cité administrative",
+    "situation_geo": "Yamoussoukro",
+    "num_marche": "2026-0-10-0-01/T/47",
+    "autorite": "AGEROUTE",
+    "date_depot": "24 février 2025",
+    "objet": "Travaux de réhabilitation de la route Yamoussoukro – Bouaflé",
+    "montant_marche": 1_250_000_000,
+    "duree": "12 mois",
+    "montant_caution": 62_500_000,
+    "prime_nette": 62_500,
+    "accessoires": 7_500,
+    "frais_analyse": 50_000,
+    "taxes": 17_400.5,
+    "prime_ttc": 137_400.5,
+    # Dates passées : jamais confondues avec la date du jour ({DATE})
+    "date_cotation": "3 mars 2025",
+    "police_num": "3240-80012345625",
+    "date_emission": "3 mars 2025",
+    "date_effet": "3 mars 2025",
+    "date_echeance": "2 mars 2026",
+    "echeance": "2026-03-02",
+    "duree_police": "365 jours",
+}
+FIXTURE_LOTS = [
+    {"Lot": "1", "Montant": 25_000_000, "Désignation": "Terrassements et chaussée"},
+    {"Lot": "2", "Montant": 22_500_000, "Désignation": "Ouvrages d'art"},
+    {"Lot": "3", "Montant": 15_000_000, "Désignation": "Signalisation et équipements"},
+]
+FIXTURE_SURETES = "Caution personnelle du gérant\nNantissement du marché à hauteur de 10 %"
+FIXTURE_AGREMENT = "Agrément en qualité de commissionnaire en douane"
+
+
+# ============================
+# JEUX D'ESSAI
+# ============================
+def _slug(text):
+    text = text.lower()
+    for accent, lettre in (("é", "e"), ("è", "e"), ("ê", "e"), ("à", "a"), ("ç", "c")):
+        text = text.replace(accent, lettre)
+    return re.sub(r"[^a-z0-9]+", "-", text).strip("-")
+
+
+def fixtures():
+    """[(nom, data, lots_data, detail_agrement)] : matrice type × lots × sûretés."""
+    matrix = []
+    for couverture in TYPES_CAUTION:
+        for avec_lots in ((False,) if couverture in TYPES_SANS_LOTS else (True, False)):
+            for avec_suretes in (True, False):
+                name = "__".join([_slug(couverture),
+                                  "lots" if avec_lots else "sans-lots",
+                                  "suretes" if avec_suretes else "sans-suretes"])
+                data = {**FIXTURE_DATA, "couverture": couverture,
+                        "suretes_text": FIXTURE_SURETES if avec_suretes else ""}
+                detail = FIXTURE_AGREMENT if couverture == "Caution d'agrément" else None
+                matrix.append((name, data, FIXTURE_LOTS if avec_lots else [], detail))
+    return matrix
+
+
+def render_fixture(fixture, optimiser=False):
+    """{"cotation": octets, "contrat": octets} d'un jeu d'essai (processus de travail)."""
+    from pdf_documents import generate_caution_pdf, generate_contrat_agrement_pdf, generate_contrat_pdf
+
+    _, data, lots_data, detail = fixture
+    documents = {"cotation": generate_caution_pdf(data, lots_data)}
+    if detail:
+        documents["contrat"] = generate_contrat_agrement_pdf(data, detail, lots_data)
+    else:
+        documents["contrat"] = generate_contrat_pdf(data, lots_data)
+    if optimiser:
+        from pdf_optimize import optimize_buffer
+        documents = {kind: optimize_buffer(buffer) for kind, buffer in documents.items()}
+    return {kind: buffer.getvalue() for kind, buffer in documents.items()}
+
+
+def snapshot_fixture(fixture, optimiser=False):
+    from fonts import font_fingerprints
+    from pdf_documents import FONT
+
+    today = datetime.date.today()
+    snapshots = {kind: extract(pdf, today) for kind, pdf in render_fixture(fixture, optimiser).items()}
+    return {"police": FONT, "empreintes": font_fingerprints(), **snapshots}
+
+
+# ============================
+# EXTRACTION
+# ============================
+def extract(pdf, today=None):
+    """
+    Instantané d'un PDF : {pages, segments: [[page, x, y, texte]],
+    images: [[page, x0, y0, x1, y1, largeur px, hauteur px, empreinte]]}.
+    Coordonnées en points, arrondies au dixième.
+    """
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+
+    date = format_date_fr(today) if today else None
+    document = pdfium.PdfDocument(pdf)
+    try:
+        segments, images = [], []
+        for number in range(len(document)):
+            page = document[number]
+            textpage = page.get_textpage()
+            for index in range(textpage.count_rects()):
+                left, bottom, right, top = textpage.get_rect(index)
+                text = " ".join(textpage.get_text_bounded(left, bottom, right, top).split())
+                if not text:
+                    continue
+                if date:
+                    text = text.replace(date, DATE_TOKEN)
+                segments.append([number + 1, round(left, 1), round(bottom, 1), text])
+            for image in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE], max_depth=8):
+                digest = hashlib.sha256(bytes(image.get_data(decode_simple=False))).hexdigest()[:16]
+                images.append([number + 1, *(round(v, 1) for v in image.get_bounds()),
+                               *image.get_px_size(), digest])
+            textpage.close()
+            page.close()
+        return {"pages": len(document), "segments": segments, "images": images}
+    finally:
+        document.close()
+
+
+# ============================
+# COMPARAISON
+# ============================
+def _close(a, b, tolerance):
+    return abs(a - b) <= tolerance
+
+
+def compare(expected, actual, tolerance=TOLERANCE_PT, strict_images=False):
+    """Liste des écarts (vide si équivalents), les MAX_ECARTS premiers."""
+    ecarts = []
+    if expected["pages"] != actual["pages"]:
+        ecarts.append(f"pages : {expected['pages']} -> {actual['pages']}")
+
+    attendus, obtenus = expected["segments"], actual["segments"]
+    for i, (a, b) in enumerate(zip(attendus, obtenus)):
+        if a[3] != b[3] or a[0] != b[0]:
+            ecarts.append(f"texte p.{a[0]} segment {i + 1} : {a[3]!r} -> p.{b[0]} {b[3]!r}")
+        elif not _close(a[2], b[2], tolerance) or \
+                (DATE_TOKEN not in a[3] and not _close(a[1], b[1], tolerance)):
+            # La largeur de la date du jour varie : seule sa ligne est comparée
+            ecarts.append(f"position p.{a[0]} {a[3][:40]!r} : ({a[1]}, {a[2]}) -> ({b[1]}, {b[2]})")
+        if len(ecarts) >= MAX_ECARTS:
+            return ecarts
+    if len(attendus) != len(obtenus):
+        reste = attendus[len(obtenus):] or obtenus[len(attendus):]
+        sens = "manquant" if len(attendus) > len(obtenus) else "en trop"
+        ecarts.append(f"{abs(len(attendus) - len(obtenus))} segment(s) {sens}, dont p.{reste[0][0]} "
+                      f"{reste[0][3]!r}")
+
+    if len(expected["images"]) != len(actual["images"]):
+        ecarts.append(f"images : {len(expected['images'])} -> {len(actual['images'])}")
+    for a, b in zip(expected["images"], actual["images"]):
+        if a[0] != b[0] or not all(_close(x, y, tolerance) for x, y in zip(a[1:5], b[1:5])):
+            ecarts.append(f"image p.{a[0]} : {a[1:5]} -> p.{b[0]} {b[1:5]}")
+        elif strict_images and a[5:] != b[5:]:
+            ecarts.append(f"image p.{a[0]} {a[1:5]} : contenu modifié ({a[5]}×{a[6]} -> {b[5]}×{b[6]})")
+    return ecarts[:MAX_ECARTS]
+
+
+# ============================
+# INSTANTANÉS DE RÉFÉRENCE
+# ============================
+def _golden_path(name):
+    return os.path.join(GOLDEN_DIR, f"{name}.json")
+
+
+def _dump(snapshot):
+    """JSON à un segment par ligne : diffs git lisibles."""
+    lines = ["{", f'  "police": {json.dumps(snapshot["police"])},',
+             f'  "empreintes": {json.dumps(snapshot["empreintes"])},']
+    kinds = [k for k in snapshot if k not in ("police", "empreintes")]
+    for n, kind in enumerate(kinds):
+        doc = snapshot[kind]
+        lines.append(f'  {json.dumps(kind)}: {{')
+        lines.append(f'    "pages": {doc["pages"]},')
+        for key in ("segments", "images"):
+            rows = [f"      {json.dumps(row, ensure_ascii=False)}" for row in doc[key]]
+            lines.append(f'    "{key}": [' + ("\n" + ",\n".join(rows) + "\n    ]" if rows else "]")
+                         + ("," if key == "segments" else ""))
+        lines.append("  }" + ("," if n < len(kinds) - 1 else ""))
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def run_matrix(optimiser=False, workers=None):
+    matrix = fixtures()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        snapshots = pool.map(snapshot_fixture, matrix, [optimiser] * len(matrix))
+        return [(fixture[0], snapshot) for fixture, snapshot in zip(matrix, snapshots)]
+
+
+def write_golden(workers=None):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for stale in glob.glob(os.path.join(GOLDEN_DIR, "*.json")):
+        os.remove(stale)
+    results = run_matrix(workers=workers)
+    for name, snapshot in results:
+        with open(_golden_path(name), "w", encoding="utf-8") as f:
+            f.write(_dump(snapshot))
+    return len(results)
+
+
+def _font_label(snapshot):
+    empreintes = snapshot.get("empreintes") or {}
+    return f"{snapshot['police']} ({', '.join(f'{n} {h[:12]}' for n, h in empreintes.items()) or 'sans empreinte'})"
+
+
+def verify_golden(optimiser=False, strict_images=False, workers=None):
+    """{nom du jeu d'essai: [écarts]} pour les seuls jeux en écart."""
+    failures = {}
+    for name, snapshot in run_matrix(optimiser, workers):
+        path = _golden_path(name)
+        if not os.path.exists(path):
+            failures[name] = ["instantané de référence absent (python pdf_equivalence.py snapshot)"]
+            continue
+        with open(path, encoding="utf-8") as f:
+            golden = json.load(f)
+        if (golden["police"], golden.get("empreintes")) != (snapshot["police"], snapshot["empreintes"]):
+            # Autre fichier de police : positions et coupures non comparables
+            failures[name] = [f"mauvaise police : référence {_font_label(golden)}, "
+                              f"rendu {_font_label(snapshot)} (dossier fonts/ absent ou modifié ?)"]
+            continue
+        ecarts = []
+        for kind in ("cotation", "contrat"):
+            ecarts += [f"{kind} : {e}" for e in compare(golden[kind], snapshot[kind],
+                                                        strict_images=strict_images)]
+        if ecarts:
+            failures[name] = ecarts
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Équivalence sémantique des PDF générés")
+    sub = parser.add_subparsers(dest="commande", required=True)
+    p = sub.add_parser("snapshot", help="Écrire les instantanés de référence (golden/)")
+    p.add_argument("--workers", type=int, default=None)
+    p = sub.add_parser("verifier", help="Comparer le rendu actuel aux instantanés de référence")
+    p.add_argument("--optimiser", action="store_true", help="Vérifier aussi la sortie pikepdf")
+    p.add_argument("--images-strictes", action="store_true", help="Comparer aussi le contenu des images")
+    p.add_argument("--workers", type=int, default=None)
+    p = sub.add_parser("comparer", help="Comparer deux fichiers PDF")
+    p.add_argument("avant")
+    p.add_argument("apres")
+    p.add_argument("--images-strictes", action="store_true")
+    args = parser.parse_args()
+
+    if args.commande == "snapshot":
+        print(f"{write_golden(args.workers)} instantanés écrits dans {GOLDEN_DIR}")
+        return
+    if args.commande == "comparer":
+        with open(args.avant, "rb") as f:
+            avant = extract(f.read())
+        with open(args.apres, "rb") as f:
+            apres = extract(f.read())
+        ecarts = compare(avant, apres, strict_images=args.images_strictes)
+        print("\n".join(ecarts) or "Documents équivalents")
+        sys.exit(1 if ecarts else 0)
+
+    failures = verify_golden(args.optimiser, args.images_strictes, args.workers)
+    for name, ecarts in failures.items():
+        print(f"✗ {name}")
+        for ecart in ecarts:
+            print(f"    {ecart}")
+    print(f"{len(fixtures()) - len(failures)}/{len(fixtures())} jeux d'essai équivalents")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Optimisation des PDF livrés : objets regroupés en flux d'objets
+compressés, images identiques dédupliquées et fichier linéarisé
+(« affichage web rapide » : la première page est lisible avant la fin du
+téléchargement).
+
+Les flux de contenu et d'images sont déjà compressés par reportlab (sans
+surcouche ASCII85, cf. pdf_documents) : ils sont recopiés tels quels, sans
+décompression ni recompression, ce qui ramène l'optimisation à quelques
+millisecondes.
+
+Repose sur qpdf via pikepdf (dépendance optionnelle) ; sans pikepdf, les
+documents sont livrés tels que reportlab les produit.
+"""
+import hashlib
+from io import BytesIO
+
+
+def available():
+    try:
+        import pikepdf  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _image_key(xobject):
+    """Empreinte d'une image : données brutes, dictionnaire et masque éventuel."""
+    digest = hashlib.sha256(xobject.read_raw_bytes())
+    for key in sorted(k for k in xobject.keys() if k not in ("/Length", "/SMask")):
+        digest.update(f"{key}={xobject[key]}".encode())
+    smask = xobject.get("/SMask")
+    if smask is not None:
+        digest.update(_image_key(smask))
+    return digest.digest()
+
+
+def _dedupe_images(pdf):
+    """Fait pointer toutes les pages vers une seule copie de chaque image ; retourne le nb fusionné."""
+    seen, merged = {}, 0
+    for page in pdf.pages:
+        resources = page.obj.get("/Resources")
+        xobjects = resources.get("/XObject") if resources is not None else None
+        if xobjects is None:
+            continue
+        for name in list(xobjects.keys()):
+            xobject = xobjects[name]
+            if xobject.get("/Subtype") != "/Image":
+                continue
+            original = seen.setdefault(_image_key(xobject), xobject)
+            if original.objgen != xobject.objgen:
+                xobjects[name] = original
+                merged += 1
+    return merged
+
+
+def optimize_pdf(pdf, linearize=True):
+    """Octets PDF optimisés ; les objets non référencés sont omis à l'écriture."""
+    import pikepdf
+
+    with pikepdf.open(BytesIO(pdf)) as document:
+        _dedupe_images(document)
+        output = BytesIO()
+        document.save(output,
+                      linearize=linearize,
+                      compress_streams=False,
+                      stream_decode_level=pikepdf.StreamDecodeLevel.none,
+                      object_stream_mode=pikepdf.ObjectStreamMode.generate)
+    return output.getvalue()
+
+
+def optimize_buffer(buffer, linearize=True):
+    """Variante pour les générateurs (BytesIO en entrée et en sortie)."""
+    return BytesIO(optimize_pdf(buffer.getvalue(), linearize))
+
+
+def first_page_bytes(pdf):
+    """
+    Octets à recevoir avant de pouvoir afficher la page 1 : fin de la
+    section première page (/E du dictionnaire de linéarisation), ou le
+    fichier entier pour un PDF non linéarisé (xref en fin de fichier).
+    """
+    import pikepdf
+
+    with pikepdf.open(BytesIO(pdf)) as document:
+        if not document.is_linearized:
+            return len(pdf)
+    head = pdf[:2048]
+    start = head.find(b"/Linearized")
+    end = head.find(b">>", start)
+    tokens = head[start:end].replace(b"/", b" /").split()
+    for i, token in enumerate(tokens):
+        if token == b"/E":
+            return int(tokens[i + 1])
+    return len(pdf)
@@ -0,0 +1,99 @@
+"""
+Aperçus des PDF générés (cotation, contrat) avant téléchargement.
+
+La page 1 (ou toutes les pages en basse résolution) est rastérisée avec
+pdfium, sur un fil dédié : le fil du script Streamlit ne fait qu'attendre
+le résultat. Les images sont mises en cache par empreinte du document,
+avec éviction LRU sous un budget en octets, partagé par toutes les
+sessions : un document déjà vu s'affiche immédiatement.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+
+FIRST_PAGE_DPI = 110
+ALL_PAGES_DPI = 50
+
+
+def render_pages(pdf, all_pages=False):
+    """Liste d'images PNG (octets) : page 1, ou toutes les pages en basse résolution."""
+    import pypdfium2 as pdfium
+
+    document = pdfium.PdfDocument(pdf)
+    try:
+        dpi = ALL_PAGES_DPI if all_pages else FIRST_PAGE_DPI
+        count = len(document) if all_pages else min(1, len(document))
+        images = []
+        for index in range(count):
+            page = document[index]
+            bitmap = page.render(scale=dpi / 72)
+            buffer = BytesIO()
+            bitmap.to_pil().save(buffer, format="PNG", optimize=False)
+            images.append(buffer.getvalue())
+            page.close()
+        return images
+    finally:
+        document.close()
+
+
+class PreviewCache:
+    """Cache LRU (empreinte, mode) -> images, borné en octets."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        # pdfium n'est pas réentrant : un seul fil de rendu
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-preview")
+        self.hits = self.misses = 0
+
+    def previews(self, pdf, all_pages=False):
+        """
+        Future des images du document. Résolue d'emblée sur un succès de
+        cache ; un même document demandé deux fois n'est rendu qu'une fois.
+        """
+        key = (hashlib.sha256(pdf).hexdigest(), all_pages)
+        with self._lock:
+            images = self._entries.get(key)
+            if images is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _resolved(images)
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            self.misses += 1
+            future = self._executor.submit(render_pages, pdf, all_pages)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def _store(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.exception() is not None:
+                return
+            images = future.result()
+            size = sum(len(image) for image in images)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = images
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= sum(len(image) for image in evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entrees": len(self._entries), "octets": self._bytes,
+                    "succes": self.hits, "echecs": self.misses}
+
+
+def _resolved(value):
+    future = Future()
+    future.set_result(value)
+    return future
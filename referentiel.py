@@ -0,0 +1,20 @@
+"""
+Listes de référence partagées par l'application et ses pages.
+"""
+
+TYPES_CAUTION = [
+    "Soumission",
+    "Avance sur démarrage",
+    "Bonne exécution",
+    "Retenue de garantie",
+    "Provisoire",
+    "Intermédiaire d'assurance",
+    "Agence de voyage",
+    "Fondateur d'établissement",
+    "Caution d'agrément",
+]
+
+# Types de caution qui ne nécessitent pas de lots
+TYPES_SANS_LOTS = ["Intermédiaire d'assurance", "Agence de voyage", "Fondateur d'établissement", "Caution d'agrément"]
+
+STATUTS_COTATION = ["Générée", "Contractualisée"]
@@ -0,0 +1,196 @@
+"""
+Renouvellements : cotations de renouvellement pour les polices arrivant
+à échéance dans les N prochains jours.
+
+Pour chaque police concernée (requête indexée sur polices.echeance,
+parcours par clé) : nouveau calcul de prime au tarif en vigueur, PDF de
+cotation rendu en parallèle (un processus par cœur), puis mise en file
+de revue (table renouvellements, statut "À revoir"). Les polices déjà en
+file sont ignorées et la mise en file est un upsert sur police_id : le
+traitement peut être relancé, y compris en parallèle d'un autre, sans
+doublon ni arrêt.
+
+Usage (ex. cron quotidien à 6 h) :
+    0 6 * * * cd /srv/caution && python renewals.py --jours 30
+"""
+import argparse
+import datetime
+import logging
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cotation_history import apply_keyset, cotation_from_row
+from formatting import format_date_fr
+from tarification import accessoires_de_base, calculer_prime
+
+PAGE_SIZE = 500
+INSERT_BATCH = 500
+
+_log = logging.getLogger(__name__)
+
+
+def reprice(data):
+    """
+    Décompte au tarif actuel. Le taux effectif (réduction comprise) et les
+    accessoires complémentaires de la cotation d'origine sont conservés ;
+    le barème d'accessoires et la taxe sont ceux en vigueur.
+    """
+    montant = float(data.get("montant_caution") or 0)
+    prime_nette = float(data.get("prime_nette") or 0)
+    taux = prime_nette / montant * 100 if montant else 0.0
+    accessoires_plus = max(0.0, float(data.get("accessoires") or 0) - accessoires_de_base(prime_nette))
+    return calculer_prime(montant, taux, 0.0, accessoires_plus, float(data.get("frais_analyse") or 0))
+
+
+def iter_expiring(client, debut, fin):
+    """Polices dont l'échéance est comprise entre debut et fin, avec cotation et lots."""
+    cursor = None
+    while True:
+        query = client.table('polices') \
+                      .select('id, police_num, echeance, cotation_id, '
+                              'cotations(*, lots(id, rang, lot_num, montant, designation))') \
+                      .gte('echeance', debut.isoformat()) \
+                      .lte('echeance', fin.isoformat())
+        query = apply_keyset(query, cursor, column="echeance", desc=False)
+        rows = query.order('echeance').order('id').limit(PAGE_SIZE).execute().data or []
+        if rows:
+            yield rows
+            cursor = (rows[-1]["echeance"], rows[-1]["id"])
+        if len(rows) < PAGE_SIZE:
+            break
+
+
+def already_queued(client, police_ids):
+    if not police_ids:
+        return set()
+    response = client.table('renouvellements').select('police_id') \
+                     .in_('police_id', police_ids).execute()
+    return {row["police_id"] for row in response.data or []}
+
+
+def build_job(row, output_dir, today):
+    cotation = cotation_from_row(row["cotations"])
+    data = cotation["data"]
+    decompte = reprice(data)
+    data.update(decompte)
+    data["date_cotation"] = format_date_fr(today)
+    return {
+        "police_id": row["id"],
+        "cotation_id": row["cotation_id"],
+        "police_num": row["police_num"],
+        "echeance": row["echeance"],
+        "data": data,
+        "lots_data": cotation["lots_data"],
+        "path": os.path.join(output_dir, f"Renouvellement_{row['police_num']}.pdf"),
+    }
+
+
+def render_job(job):
+    """Exécuté dans un processus de travail : rend et écrit le PDF."""
+    from pdf_documents import generate_caution_pdf
+
+    t0 = time.perf_counter()
+    pdf = generate_caution_pdf(job["data"], job["lots_data"]).getvalue()
+    with open(job["path"], "wb") as f:
+        f.write(pdf)
+    return job, len(pdf), time.perf_counter() - t0
+
+
+def queue_record(job):
+    data = job["data"]
+    return {
+        "police_id": job["police_id"],
+        "cotation_id": job["cotation_id"],
+        "police_num": job["police_num"],
+        "assure": data.get("assure"),
+        "couverture": data.get("couverture"),
+        "echeance": job["echeance"],
+        "montant_caution": data.get("montant_caution"),
+        "prime_nette": data["prime_nette"],
+        "accessoires": data["accessoires"],
+        "frais_analyse": data["frais_analyse"],
+        "taxes": data["taxes"],
+        "prime_ttc": data["prime_ttc"],
+        "pdf_path": job["path"],
+    }
+
+
+def run(client, jours=30, output_dir="renouvellements", workers=None, dry_run=False):
+    """Traite toutes les polices échéant dans `jours` jours ; retourne le rapport."""
+    os.makedirs(output_dir, exist_ok=True)
+    today = datetime.date.today()
+    fin = today + datetime.timedelta(days=jours)
+    report = {"polices": 0, "deja_en_file": 0, "rendus": 0, "erreurs": 0, "octets": 0}
+    durations, batch = [], []
+
+    def flush():
+        if batch and not dry_run:
+            # police_id est unique : une police mise en file entre-temps est ignorée
+            try:
+                client.table('renouvellements').upsert(batch, on_conflict="police_id",
+                                                       ignore_duplicates=True).execute()
+            except Exception as e:
+                report["erreurs"] += len(batch)
+                _log.error("Mise en file de %d renouvellements impossible : %s", len(batch), e)
+        batch.clear()
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Les pages suivantes sont lues pendant que les processus rendent les précédentes
+        futures = []
+        for rows in iter_expiring(client, today, fin):
+            report["polices"] += len(rows)
+            queued = already_queued(client, [row["id"] for row in rows])
+            report["deja_en_file"] += len(queued)
+            for row in rows:
+                if row["id"] not in queued and row.get("cotations"):
+                    futures.append(pool.submit(render_job, build_job(row, output_dir, today)))
+
+        for future in as_completed(futures):
+            try:
+                job, size, seconds = future.result()
+            except Exception as e:
+                report["erreurs"] += 1
+                _log.error("Erreur de rendu : %s", e)
+                continue
+            report["rendus"] += 1
+            report["octets"] += size
+            durations.append(seconds)
+            batch.append(queue_record(job))
+            if len(batch) >= INSERT_BATCH:
+                flush()
+        flush()
+
+    elapsed = time.perf_counter() - t0
+    report["duree_s"] = elapsed
+    report["docs_par_s"] = report["rendus"] / elapsed if elapsed else 0.0
+    if durations:
+        durations.sort()
+        report["rendu_p50_ms"] = statistics.median(durations) * 1000
+        report["rendu_p95_ms"] = durations[int(0.95 * (len(durations) - 1))] * 1000
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cotations de renouvellement des polices arrivant à échéance")
+    parser.add_argument("--jours", type=int, default=30, help="Horizon d'échéance en jours")
+    parser.add_argument("--output", default="renouvellements", help="Dossier des PDF générés")
+    parser.add_argument("--workers", type=int, default=None, help="Processus de rendu (défaut : nb de cœurs)")
+    parser.add_argument("--dry-run", action="store_true", help="Générer sans mettre en file de revue")
+    args = parser.parse_args()
+
+    logging.basicConfig(format="%(levelname)s %(message)s")
+    from supabase_client import create_supabase_client
+    report = run(create_supabase_client(), args.jours, args.output, args.workers, args.dry_run)
+    print(f"{report['polices']} polices à échéance, {report['deja_en_file']} déjà en file, "
+          f"{report['rendus']} renouvellements générés, {report['erreurs']} erreurs")
+    print(f"Durée {report['duree_s']:.1f} s – {report['docs_par_s']:.1f} documents/s – "
+          f"{report['octets'] / 1_048_576:.1f} Mo")
+    if "rendu_p50_ms" in report:
+        print(f"Rendu par document : p50 {report['rendu_p50_ms']:.0f} ms, p95 {report['rendu_p95_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Budget mémoire par session et débordement (spill) sur disque.
+
+Chaque session Streamlit conserve ses PDF générés et l'état de passage
+cotation -> contrat. Ce gestionnaire, partagé par tout le processus :
+  - mesure la taille (en octets) des données de chaque session ;
+  - garde en mémoire les petits contenus, écrit les gros sur disque ;
+  - respecte un plafond mémoire global au processus (les contenus les
+    moins récemment utilisés sont déversés sur disque en premier) ;
+  - expire les sessions inactives et supprime leurs fichiers.
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+
+class _Entry:
+    __slots__ = ("payload", "path", "size", "pickled", "last_access")
+
+    def __init__(self, payload, size, pickled):
+        self.payload = payload      # bytes en mémoire, ou None si déversé
+        self.path = None            # fichier de débordement, sinon None
+        self.size = size
+        self.pickled = pickled
+        self.last_access = time.monotonic()
+
+
+class _Session:
+    __slots__ = ("entries", "last_seen")
+
+    def __init__(self):
+        self.entries = {}
+        self.last_seen = time.monotonic()
+
+
+class SessionMemoryManager:
+    """
+    Stockage des contenus volumineux d'une session (PDF, lots...).
+    Les valeurs non binaires sont sérialisées (pickle) : chaque lecture
+    renvoie une copie indépendante.
+    """
+
+    def __init__(self, ceiling_bytes=256 * 1024 * 1024,
+                 session_budget_bytes=32 * 1024 * 1024,
+                 spill_threshold_bytes=256 * 1024,
+                 idle_ttl_seconds=1800, spill_dir=None,
+                 sweep_interval_seconds=60):
+        self.ceiling_bytes = ceiling_bytes
+        self.session_budget_bytes = session_budget_bytes
+        self.spill_threshold_bytes = spill_threshold_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self.spill_dir = tempfile.mkdtemp(prefix="caution_spill_", dir=spill_dir)
+        else:
+            self.spill_dir = tempfile.mkdtemp(prefix="caution_spill_")
+        self._sessions = {}
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._last_sweep = time.monotonic()
+        self._lock = threading.RLock()
+
+    # ---------- API publique ----------
+    def touch(self, token):
+        """Marque la session comme active et expire les sessions inactives."""
+        with self._lock:
+            self._session(token).last_seen = time.monotonic()
+            if time.monotonic() - self._last_sweep >= self.sweep_interval_seconds:
+                self.expire_idle()
+
+    def put(self, token, key, value):
+        """Enregistre une valeur (bytes, BytesIO ou objet sérialisable)."""
+        pickled = False
+        if hasattr(value, "getvalue"):
+            payload = value.getvalue()
+        elif isinstance(value, (bytes, bytearray)):
+            payload = bytes(value)
+        else:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            pickled = True
+
+        with self._lock:
+            session = self._session(token)
+            session.last_seen = time.monotonic()
+            self._drop(session, key)
+            entry = _Entry(payload, len(payload), pickled)
+            session.entries[key] = entry
+            self._memory_bytes += entry.size
+            if entry.size > self.spill_threshold_bytes:
+                self._spill(entry)
+            self._enforce_session_budget(session)
+            self._enforce_ceiling()
+
+    def get(self, token, key, default=None):
+        """Relit une valeur depuis la mémoire ou le disque."""
+        with self._lock:
+            session = self._sessions.get(token)
+            entry = session.entries.get(key) if session else None
+            if entry is None:
+                return default
+            now = time.monotonic()
+            session.last_seen = now
+            entry.last_access = now
+            payload, path, pickled = entry.payload, entry.path, entry.pickled
+
+        if payload is None:
+            try:
+                with open(path, "rb") as f:
+                    payload = f.read()
+            except OSError:
+                return default
+        return pickle.loads(payload) if pickled else payload
+
+    def reader(self, token, key):
+        """Callable pour st.download_button : le fichier n'est lu qu'au clic."""
+        def read():
+            return self.get(token, key, b"")
+        return read
+
+    def contains(self, token, key):
+        with self._lock:
+            session = self._sessions.get(token)
+            return bool(session) and key in session.entries
+
+    def release(self, token, key):
+        with self._lock:
+            session = self._sessions.get(token)
+            if session:
+                self._drop(session, key)
+
+    def expire_idle(self):
+        """Supprime les sessions inactives depuis plus de idle_ttl_seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._last_sweep = now
+            expired = [t for t, s in self._sessions.items()
+                       if now - s.last_seen > self.idle_ttl_seconds]
+            for token in expired:
+                session = self._sessions.pop(token)
+                for key in list(session.entries):
+                    self._drop(session, key)
+            return len(expired)
+
+    def session_bytes(self, token):
+        with self._lock:
+            session = self._sessions.get(token)
+            return sum(e.size for e in session.entries.values()) if session else 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "ceiling_bytes": self.ceiling_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            self._sessions.clear()
+            self._memory_bytes = self._disk_bytes = 0
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    # ---------- Interne (appelé sous verrou) ----------
+    def _session(self, token):
+        session = self._sessions.get(token)
+        if session is None:
+            session = self._sessions[token] = _Session()
+        return session
+
+    def _spill(self, entry):
+        path = os.path.join(self.spill_dir, uuid.uuid4().hex)
+        with open(path, "wb") as f:
+            f.write(entry.payload)
+        entry.payload = None
+        entry.path = path
+        self._memory_bytes -= entry.size
+        self._disk_bytes += entry.size
+
+    def _drop(self, session, key):
+        entry = session.entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.payload is not None:
+            self._memory_bytes -= entry.size
+        else:
+            self._disk_bytes -= entry.size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _enforce_session_budget(self, session):
+        in_memory = [e for e in session.entries.values() if e.payload is not None]
+        used = sum(e.size for e in in_memory)
+        for entry in sorted(in_memory, key=lambda e: e.last_access):
+            if used <= self.session_budget_bytes:
+                break
+            self._spill(entry)
+            used -= entry.size
+
+    def _enforce_ceiling(self):
+        if self._memory_bytes <= self.ceiling_bytes:
+            return
+        candidates = [e for s in self._sessions.values()
+                      for e in s.entries.values() if e.payload is not None]
+        for entry in sorted(candidates, key=lambda e: e.last_access):
+            if self._memory_bytes <= self.ceiling_bytes:
+                break
+            self._spill(entry)
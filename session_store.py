@@ -0,0 +1,150 @@
+"""
+Magasin partagé pour l'état de passage cotation -> contrat.
+
+L'état est indexé par un jeton de session (transmis dans l'URL), et non
+plus conservé dans st.session_state : tout processus qui partage le
+magasin peut donc reprendre l'étape contrat.
+
+Implémentations :
+  - SQLiteSessionStore : fichier SQLite sur un disque local, partagé par
+    les processus d'une même machine. Le journal WAL repose sur une
+    mémoire partagée que les systèmes de fichiers réseau (NFS, SMB...) ne
+    fournissent pas : le fichier ne doit pas être placé sur un volume
+    partagé entre machines ;
+  - MemorySessionStore : dictionnaire en mémoire (processus unique).
+Des répliques sur plusieurs machines nécessitent un magasin serveur
+(Redis, Postgres...) implémentant SessionStore.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+class SessionStore(ABC):
+    """Interface commune. Les valeurs doivent être sérialisables en JSON."""
+
+    def __init__(self, ttl_seconds=86400):
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def get(self, token, key, default=None):
+        pass
+
+    @abstractmethod
+    def put(self, token, key, value):
+        pass
+
+    @abstractmethod
+    def delete(self, token, key=None):
+        """Supprime une clé, ou toute la session si key est None."""
+
+    @abstractmethod
+    def purge_expired(self):
+        """Supprime les entrées plus anciennes que ttl_seconds."""
+
+
+class MemorySessionStore(SessionStore):
+
+    def __init__(self, ttl_seconds=86400):
+        super().__init__(ttl_seconds)
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, token, key, default=None):
+        with self._lock:
+            item = self._data.get((token, key))
+        if item is None or time.time() - item[1] > self.ttl_seconds:
+            return default
+        return json.loads(item[0])
+
+    def put(self, token, key, value):
+        with self._lock:
+            self._data[(token, key)] = (json.dumps(value), time.time())
+
+    def delete(self, token, key=None):
+        with self._lock:
+            for k in [k for k in self._data if k[0] == token and key in (None, k[1])]:
+                del self._data[k]
+
+    def purge_expired(self):
+        limit = time.time() - self.ttl_seconds
+        with self._lock:
+            for k in [k for k, v in self._data.items() if v[1] < limit]:
+                del self._data[k]
+
+
+class SQLiteSessionStore(SessionStore):
+
+    def __init__(self, path, ttl_seconds=86400, purge_interval_seconds=600):
+        super().__init__(ttl_seconds)
+        self.path = path
+        self.purge_interval_seconds = purge_interval_seconds
+        self._last_purge = 0.0
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_handoff (
+                token TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (token, key)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_session_handoff_updated_at "
+                     "ON session_handoff (updated_at)")
+
+    def _conn(self):
+        # Une connexion par thread (les sessions Streamlit tournent sur des threads distincts)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, token, key, default=None):
+        row = self._conn().execute(
+            "SELECT value FROM session_handoff WHERE token = ? AND key = ? AND updated_at >= ?",
+            (token, key, time.time() - self.ttl_seconds)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put(self, token, key, value):
+        now = time.time()
+        self._conn().execute(
+            "INSERT INTO session_handoff (token, key, value, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (token, key) DO UPDATE SET value = excluded.value, "
+            "updated_at = excluded.updated_at",
+            (token, key, json.dumps(value), now))
+        if now - self._last_purge >= self.purge_interval_seconds:
+            self.purge_expired()
+
+    def delete(self, token, key=None):
+        if key is None:
+            self._conn().execute("DELETE FROM session_handoff WHERE token = ?", (token,))
+        else:
+            self._conn().execute("DELETE FROM session_handoff WHERE token = ? AND key = ?",
+                                 (token, key))
+
+    def purge_expired(self):
+        self._last_purge = time.time()
+        self._conn().execute("DELETE FROM session_handoff WHERE updated_at < ?",
+                             (self._last_purge - self.ttl_seconds,))
+
+
+def create_session_store(url, ttl_seconds=86400):
+    """
+    Construit le magasin à partir d'une URL :
+    "sqlite:///chemin/vers/fichier.db" ou "memory://".
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionStore(url[len("sqlite:///"):], ttl_seconds=ttl_seconds)
+    if url.startswith("memory://"):
+        return MemorySessionStore(ttl_seconds=ttl_seconds)
+    raise ValueError(f"Magasin de session non supporté : {url}")
@@ -0,0 +1,216 @@
+"""
+Signature électronique des contrats (PAdES B-B, SHA-256) avec une clé et
+une chaîne de certificats lues dans un magasin PKCS#12 local.
+
+Le cachet « POUR L'ASSUREUR » (signature.png) reste imprimé ; la signature
+cryptographique, ajoutée en mise à jour incrémentale, couvre tout le
+fichier : la moindre modification ultérieure la rend invalide. Elle est
+donc la dernière étape, après l'optimisation pikepdf (finaliser_pdf).
+
+Le déchiffrement du PKCS#12 et le décodage de la clé privée coûtent
+chacun plusieurs dizaines de millisecondes : le signataire est chargé une
+fois par processus et garde la clé décodée en mémoire (load_signer), y
+compris dans les processus du pool de rendu qui signent les actes par lot
+en parallèle (sign_document, sign_many). La place de la signature est
+réservée d'après la taille de la chaîne de certificats, sans la signature
+d'essai que pyHanko ferait sinon pour l'estimer.
+
+Repose sur pyHanko (dépendance optionnelle) ; sans pyHanko ou sans
+magasin configuré, les contrats sont émis non signés.
+
+Usage :
+    SIGNATURE_PKCS12_PASSWORD=... python signing.py signer --pkcs12 cle.p12 Contrat_*.pdf [-o signes/] [--workers 4]
+    python signing.py verifier Contrat_*.pdf [--certificat autorite.pem]
+"""
+import argparse
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+FIELD_NAME = "Signature_Leadway"
+REASON = "Émission du contrat de cautionnement"
+LOCATION = "Abidjan"
+# Attributs signés, identifiants d'algorithmes et signature (RSA 4096 compris)
+RESERVE_MARGIN = 4096
+
+_signers = {}
+_lock = threading.Lock()
+
+
+def available():
+    try:
+        import pyhanko  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _signer_class():
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric.ec import ECDSA
+    from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+    from pyhanko.sign.general import get_pyca_cryptography_hash
+    from pyhanko.sign.signers import SimpleSigner
+
+    class KeyInMemorySigner(SimpleSigner):
+        """SimpleSigner redécode la clé privée à chaque signature : décodée une fois ici."""
+
+        _private_key = None
+
+        def sign_raw(self, data, digest_algorithm):
+            mechanism = self.get_signature_mechanism_for_digest(digest_algorithm).signature_algo
+            if mechanism not in ("rsassa_pkcs1v15", "ecdsa"):
+                return super().sign_raw(data, digest_algorithm)
+            if self._private_key is None:
+                self._private_key = serialization.load_der_private_key(self.signing_key.dump(), password=None)
+            hash_algo = get_pyca_cryptography_hash(digest_algorithm)
+            if mechanism == "ecdsa":
+                return self._private_key.sign(data, ECDSA(hash_algo))
+            return self._private_key.sign(data, PKCS1v15(), hash_algo)
+
+    return KeyInMemorySigner
+
+
+def load_signer(keystore, passphrase=None):
+    """Signataire du magasin PKCS#12, déchiffré une seule fois par processus."""
+    key = os.path.abspath(keystore)
+    with _lock:
+        signer = _signers.get(key)
+        if signer is None:
+            cls = _signer_class()
+            loaded = cls.load_pkcs12(key, passphrase=passphrase.encode() if isinstance(passphrase, str)
+                                     else passphrase)
+            if loaded is None:
+                raise ValueError(f"Magasin PKCS#12 illisible ou mot de passe incorrect : {keystore}")
+            # load_pkcs12 construit toujours un SimpleSigner
+            signer = cls(signing_cert=loaded.signing_cert, signing_key=loaded.signing_key,
+                         cert_registry=loaded.cert_registry)
+            signer.bytes_reserved = RESERVE_MARGIN + sum(
+                len(cert.dump()) for cert in [signer.signing_cert, *signer.cert_registry])
+            _signers[key] = signer
+    return signer
+
+
+def sign_pdf(pdf, signer, reason=REASON, location=LOCATION):
+    """Octets PDF signés (champ de signature invisible, ajout incrémental)."""
+    from pyhanko.pdf_utils.incremental_writer import IncrementalPdfFileWriter
+    from pyhanko.sign import fields, signers
+
+    metadata = signers.PdfSignatureMetadata(
+        field_name=FIELD_NAME, reason=reason, location=location,
+        md_algorithm="sha256", subfilter=fields.SigSeedSubFilter.PADES,
+    )
+    writer = IncrementalPdfFileWriter(BytesIO(pdf))
+    return signers.PdfSigner(metadata, signer=signer).sign_pdf(
+        writer, bytes_reserved=getattr(signer, "bytes_reserved", None)).getvalue()
+
+
+def sign_buffer(buffer, signer, **options):
+    return BytesIO(sign_pdf(buffer.getvalue(), signer, **options))
+
+
+def sign_document(pdf, config):
+    """
+    Depuis un processus de travail : config = {"keystore", "passphrase"[,
+    "location"]}, le signataire du processus est réutilisé d'un appel à l'autre.
+    """
+    signer = load_signer(config["keystore"], config.get("passphrase"))
+    return sign_pdf(pdf, signer, location=config.get("location", LOCATION))
+
+
+def sign_many(pdfs, config, executor=None, workers=None):
+    """Signe une série de documents en parallèle ; retourne les octets signés dans l'ordre."""
+    items = list(pdfs)
+    if executor is not None:
+        return list(executor.map(sign_document, items, [config] * len(items)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(sign_document, items, [config] * len(items)))
+
+
+def verify_pdf(pdf, trust_roots=None):
+    """
+    État des signatures du document : [{champ, signataire, intacte, valide,
+    couverture}]. Sans certificats de confiance, valide reste faux pour un
+    certificat interne : seule l'intégrité (intacte) est alors probante.
+    """
+    from pyhanko.pdf_utils.reader import PdfFileReader
+    from pyhanko.sign.validation import validate_pdf_signature
+    from pyhanko_certvalidator import ValidationContext
+
+    context = ValidationContext(trust_roots=list(trust_roots or []))
+    resultats = []
+    for signature in PdfFileReader(BytesIO(pdf)).embedded_signatures:
+        status = validate_pdf_signature(signature, context)
+        resultats.append({
+            "champ": signature.field_name,
+            "signataire": status.signing_cert.subject.human_friendly,
+            "intacte": status.intact,
+            "valide": status.valid and status.trusted,
+            "couverture": status.coverage.name,
+        })
+    return resultats
+
+
+def load_certificates(path):
+    """Certificats PEM ou DER d'un fichier (autorités de confiance)."""
+    from asn1crypto import pem, x509
+
+    with open(path, "rb") as f:
+        data = f.read()
+    if pem.detect(data):
+        return [x509.Certificate.load(der) for _, _, der in pem.unarmor(data, multiple=True)]
+    return [x509.Certificate.load(data)]
+
+
+def read_passphrase():
+    """Mot de passe du magasin : variable d'environnement, à défaut secrets.toml."""
+    passphrase = os.environ.get("SIGNATURE_PKCS12_PASSWORD")
+    if passphrase is None:
+        import streamlit as st
+        passphrase = st.secrets.get("SIGNATURE_PKCS12_PASSWORD")
+    return passphrase
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signature électronique des contrats")
+    sub = parser.add_subparsers(dest="commande", required=True)
+    p = sub.add_parser("signer", help="Signer des PDF en parallèle")
+    p.add_argument("fichiers", nargs="+")
+    p.add_argument("--pkcs12", required=True, help="Magasin PKCS#12 (clé et chaîne)")
+    p.add_argument("-o", "--output", default="signes", help="Dossier des PDF signés")
+    p.add_argument("--workers", type=int, default=None, help="Processus de signature (défaut : cœurs)")
+    p = sub.add_parser("verifier", help="Contrôler les signatures de PDF")
+    p.add_argument("fichiers", nargs="+")
+    p.add_argument("--certificat", help="Certificat(s) de confiance, PEM ou DER")
+    args = parser.parse_args()
+
+    if args.commande == "signer":
+        config = {"keystore": args.pkcs12, "passphrase": read_passphrase()}
+        load_signer(config["keystore"], config["passphrase"])   # erreur de mot de passe avant le pool
+        pdfs = []
+        for path in args.fichiers:
+            with open(path, "rb") as f:
+                pdfs.append(f.read())
+        os.makedirs(args.output, exist_ok=True)
+        for path, signed in zip(args.fichiers, sign_many(pdfs, config, workers=args.workers)):
+            with open(os.path.join(args.output, os.path.basename(path)), "wb") as f:
+                f.write(signed)
+        print(f"{len(pdfs)} documents signés dans {args.output}")
+    else:
+        roots = load_certificates(args.certificat) if args.certificat else None
+        logging.getLogger("pyhanko").setLevel(logging.CRITICAL)   # l'état est rapporté ci-dessous
+        for path in args.fichiers:
+            with open(path, "rb") as f:
+                resultats = verify_pdf(f.read(), roots)
+            if not resultats:
+                print(f"{path} : non signé")
+            for r in resultats:
+                print(f"{path} : {r['champ']} – {r['signataire']} – "
+                      f"{'intacte' if r['intacte'] else 'ALTÉRÉE'}"
+                      f"{', certificat de confiance' if r['valide'] else ''} ({r['couverture']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+-- Historique des cotations : filtres côté serveur et pagination par clé (keyset).
+-- Ordre de parcours : (created_at DESC, id DESC).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE cotations ADD COLUMN IF NOT EXISTS created_at timestamptz NOT NULL DEFAULT now();
+
+-- Parcours sans filtre et filtre sur la période
+CREATE INDEX IF NOT EXISTS idx_cotations_created_id
+    ON cotations (created_at DESC, id DESC);
+
+-- Filtres d'égalité combinés à l'ordre de parcours
+CREATE INDEX IF NOT EXISTS idx_cotations_couverture_created_id
+    ON cotations (couverture, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_cotations_statut_created_id
+    ON cotations (statut, created_at DESC, id DESC);
+
+-- Recherche partielle (ILIKE '%...%') sur l'assuré et le numéro de marché
+CREATE INDEX IF NOT EXISTS idx_cotations_assure_trgm
+    ON cotations USING gin (assure gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_cotations_num_marche_trgm
+    ON cotations USING gin (num_marche gin_trgm_ops);
+
+-- Chargement à la demande des lots et de la police d'une cotation
+CREATE INDEX IF NOT EXISTS idx_lots_cotation_id ON lots (cotation_id);
+CREATE INDEX IF NOT EXISTS idx_polices_cotation_id ON polices (cotation_id);
@@ -0,0 +1,84 @@
+-- Tableau de bord du portefeuille : agrégats pré-calculés côté base.
+-- L'application ne lit que ces vues matérialisées (quelques centaines de lignes),
+-- jamais les tables cotations/polices complètes.
+
+ALTER TABLE polices ADD COLUMN IF NOT EXISTS created_at timestamptz NOT NULL DEFAULT now();
+
+-- Échéance au format date (date_echeance est le libellé français imprimé sur le contrat)
+ALTER TABLE polices ADD COLUMN IF NOT EXISTS echeance date;
+
+UPDATE polices
+SET echeance = make_date(
+        split_part(date_echeance, ' ', 3)::int,
+        array_position(ARRAY['janvier','février','mars','avril','mai','juin','juillet',
+                             'août','septembre','octobre','novembre','décembre'],
+                       split_part(date_echeance, ' ', 2)),
+        split_part(date_echeance, ' ', 1)::int)
+WHERE echeance IS NULL
+  AND date_echeance ~ '^\d{1,2} \S+ \d{4}$';
+
+CREATE INDEX IF NOT EXISTS idx_polices_echeance ON polices (echeance);
+
+-- Encours (polices non échues) par couverture
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_encours_couverture AS
+SELECT c.couverture,
+       count(*)                         AS nb_polices,
+       coalesce(sum(c.montant_caution), 0) AS montant_caution,
+       coalesce(sum(c.prime_ttc), 0)       AS prime_ttc
+FROM polices p
+JOIN cotations c ON c.id = p.cotation_id
+WHERE p.echeance >= current_date
+GROUP BY c.couverture;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_encours_couverture_key
+    ON mv_encours_couverture (couverture);
+
+-- Encours par assuré
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_encours_assure AS
+SELECT c.assure,
+       count(*)                         AS nb_polices,
+       coalesce(sum(c.montant_caution), 0) AS montant_caution,
+       coalesce(sum(c.prime_ttc), 0)       AS prime_ttc
+FROM polices p
+JOIN cotations c ON c.id = p.cotation_id
+WHERE p.echeance >= current_date
+GROUP BY c.assure;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_encours_assure_key
+    ON mv_encours_assure (assure);
+CREATE INDEX IF NOT EXISTS mv_encours_assure_montant
+    ON mv_encours_assure (montant_caution DESC);
+
+-- Production mensuelle (polices émises) par couverture
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_production_mensuelle AS
+SELECT date_trunc('month', p.created_at)::date AS mois,
+       c.couverture,
+       count(*)                         AS nb_polices,
+       coalesce(sum(c.montant_caution), 0) AS montant_caution,
+       coalesce(sum(c.prime_ttc), 0)       AS prime_ttc
+FROM polices p
+JOIN cotations c ON c.id = p.cotation_id
+GROUP BY 1, 2;
+
+CREATE UNIQUE INDEX IF NOT EXISTS mv_production_mensuelle_key
+    ON mv_production_mensuelle (mois, couverture);
+
+GRANT SELECT ON mv_encours_couverture, mv_encours_assure, mv_production_mensuelle
+    TO anon, authenticated;
+
+-- Rafraîchissement sans blocage des lectures
+CREATE OR REPLACE FUNCTION refresh_portefeuille() RETURNS void
+LANGUAGE sql SECURITY DEFINER SET search_path = public AS $$
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_encours_couverture;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_encours_assure;
+    REFRESH MATERIALIZED VIEW CONCURRENTLY mv_production_mensuelle;
+$$;
+
+-- Exécutée avec les droits du propriétaire : réservée à pg_cron, pas aux clients de l'API
+REVOKE EXECUTE ON FUNCTION refresh_portefeuille() FROM public, anon, authenticated;
+
+-- Rafraîchissement toutes les 10 minutes (pg_cron) : les encours (polices non
+-- échues, filtrées sur current_date) suivent le calendrier. Un job nommé
+-- est remplacé, pas dupliqué, si la migration est rejouée.
+CREATE EXTENSION IF NOT EXISTS pg_cron;
+SELECT cron.schedule('refresh_portefeuille', '*/10 * * * *', 'SELECT refresh_portefeuille()');
@@ -0,0 +1,30 @@
+-- Synchronisation incrémentale : horodatage de dernière modification
+-- et index de parcours (updated_at, id) sur les trois tables.
+
+ALTER TABLE cotations ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+ALTER TABLE lots      ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+ALTER TABLE polices   ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_cotations_updated_at ON cotations;
+CREATE TRIGGER trg_cotations_updated_at BEFORE UPDATE ON cotations
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_lots_updated_at ON lots;
+CREATE TRIGGER trg_lots_updated_at BEFORE UPDATE ON lots
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS trg_polices_updated_at ON polices;
+CREATE TRIGGER trg_polices_updated_at BEFORE UPDATE ON polices
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_cotations_updated_id ON cotations (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_lots_updated_id      ON lots (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_polices_updated_id   ON polices (updated_at, id);
@@ -0,0 +1,27 @@
+-- Renouvellements : recherche des polices arrivant à échéance et file de revue.
+
+-- Parcours par clé (echeance, id) ; remplace l'index simple sur echeance
+CREATE INDEX IF NOT EXISTS idx_polices_echeance_id ON polices (echeance, id);
+DROP INDEX IF EXISTS idx_polices_echeance;
+
+CREATE TABLE IF NOT EXISTS renouvellements (
+    id bigserial PRIMARY KEY,
+    police_id bigint NOT NULL UNIQUE REFERENCES polices (id),
+    cotation_id bigint NOT NULL REFERENCES cotations (id),
+    police_num text,
+    assure text,
+    couverture text,
+    echeance date,
+    montant_caution numeric,
+    prime_nette numeric,
+    accessoires numeric,
+    frais_analyse numeric,
+    taxes numeric,
+    prime_ttc numeric,
+    pdf_path text,
+    statut text NOT NULL DEFAULT 'À revoir',
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_renouvellements_statut_echeance
+    ON renouvellements (statut, echeance);
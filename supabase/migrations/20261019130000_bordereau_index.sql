@@ -0,0 +1,2 @@
+-- Bordereau mensuel : parcours des polices émises sur un mois, par clé (created_at, id).
+CREATE INDEX IF NOT EXISTS idx_polices_created_id ON polices (created_at, id);
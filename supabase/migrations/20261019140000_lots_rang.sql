@@ -0,0 +1,16 @@
+-- Lots : rang de saisie et clé naturelle (cotation_id, rang).
+-- Les lots sont désormais envoyés par paquets concurrents : l'id ne reflète
+-- plus l'ordre de saisie, et un paquet relancé doit pouvoir être rejoué
+-- sans doublon (upsert ON CONFLICT DO NOTHING sur cette clé).
+ALTER TABLE lots ADD COLUMN IF NOT EXISTS rang integer;
+
+UPDATE lots
+SET rang = numerotes.rang
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY cotation_id ORDER BY id) AS rang
+    FROM lots
+) AS numerotes
+WHERE lots.id = numerotes.id
+  AND lots.rang IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_lots_cotation_rang ON lots (cotation_id, rang);
@@ -0,0 +1,25 @@
+"""
+Connexion Supabase partagée par l'application, ses pages et les tâches
+lancées hors Streamlit (synchronisation, traitements par lot).
+"""
+import os
+
+import streamlit as st
+from supabase import create_client, Client
+
+
+def create_supabase_client() -> Client:
+    """
+    Client hors cache Streamlit : variables d'environnement SUPABASE_URL /
+    SUPABASE_ANON_KEY, à défaut .streamlit/secrets.toml.
+    """
+    url = os.environ.get("SUPABASE_URL") or st.secrets["SUPABASE_URL"]
+    key = os.environ.get("SUPABASE_ANON_KEY") or st.secrets["SUPABASE_ANON_KEY"]
+    return create_client(url, key)
+
+
+@st.cache_resource
+def init_supabase_client() -> Client:
+    url = st.secrets["SUPABASE_URL"]
+    key = st.secrets["SUPABASE_ANON_KEY"]
+    return create_client(url, key)
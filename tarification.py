@@ -0,0 +1,58 @@
+"""
+Tarif caution : prime nette, accessoires, taxes et prime TTC.
+"""
+import bisect
+
+TAUX_TAXE = 0.145
+
+# Barème des accessoires : prime nette jusqu'à SEUILS[i] inclus -> ACCESSOIRES[i]
+SEUILS_ACCESSOIRES = (100_000, 500_000, 1_000_000, 5_000_000, 10_000_000, 50_000_000)
+ACCESSOIRES = (5_000, 7_500, 10_000, 15_000, 20_000, 30_000, 50_000)
+
+
+def accessoires_de_base(prime_nette):
+    return ACCESSOIRES[bisect.bisect_left(SEUILS_ACCESSOIRES, prime_nette)]
+
+
+def calculer_prime(montant_caution, taux_tarif, reduction=0.0, accessoires_plus=0.0, frais_analyse=0.0):
+    """
+    taux_tarif et reduction en pourcentage (ex. 0.1 pour 0,1 %).
+    Retourne le décompte : prime_nette, accessoires, frais_analyse, taxes, prime_ttc.
+    """
+    taux_eff = taux_tarif / 100
+    red_eff = reduction / 100
+    prime_nette = taux_eff * montant_caution * (1 - red_eff)
+    accessoires = accessoires_de_base(prime_nette) + accessoires_plus
+    taxes = TAUX_TAXE * (prime_nette + accessoires + frais_analyse)
+    prime_ttc = prime_nette + accessoires + frais_analyse + taxes
+    return {
+        "prime_nette": prime_nette,
+        "accessoires": accessoires,
+        "frais_analyse": frais_analyse,
+        "taxes": taxes,
+        "prime_ttc": prime_ttc,
+    }
+
+
+def calculer_primes(montant_caution, taux_tarif, reduction=0.0, accessoires_plus=0.0, frais_analyse=0.0):
+    """
+    calculer_prime sur des tableaux : les arguments sont diffusés (numpy)
+    les uns contre les autres, p. ex. taux en colonne et réductions en ligne
+    pour une grille. Retourne le même décompte, en tableaux.
+    """
+    import numpy as np
+
+    montant = np.asarray(montant_caution, dtype=float)
+    prime_nette = np.asarray(taux_tarif, dtype=float) / 100 * montant \
+        * (1 - np.asarray(reduction, dtype=float) / 100)
+    accessoires = np.asarray(ACCESSOIRES, dtype=float)[
+        np.searchsorted(SEUILS_ACCESSOIRES, prime_nette, side="left")] + accessoires_plus
+    frais = np.broadcast_to(np.asarray(frais_analyse, dtype=float), prime_nette.shape)
+    taxes = TAUX_TAXE * (prime_nette + accessoires + frais)
+    return {
+        "prime_nette": prime_nette,
+        "accessoires": accessoires,
+        "frais_analyse": frais,
+        "taxes": taxes,
+        "prime_ttc": prime_nette + accessoires + frais + taxes,
+    }
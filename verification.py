@@ -0,0 +1,343 @@
+"""
+Vérification d'authenticité des polices par les bénéficiaires (douanes,
+maîtres d'ouvrage).
+
+Chaque contrat porte un QR code : numéro de police et jeton de
+vérification (HMAC du numéro, clé VERIFICATION_SECRET). Le jeton se
+recalcule, il n'est pas stocké ; un numéro de police deviné sans jeton ne
+révèle rien.
+
+Le service, en lecture seule, répond depuis un index en mémoire
+(police_num -> validité, statut, montant, échéance) chargé depuis polices
+et cotations, puis complété sur TTL par les seules lignes modifiées
+depuis le dernier filigrane (updated_at, id) : aucune requête base par
+vérification, quelques microsecondes par police, y compris pour un lot de
+plusieurs milliers d'actes.
+
+Usage :
+    python verification.py serve --port 8503
+        GET  /verifier?police=...&jeton=...        (page lisible, cible du QR code)
+        GET  /api/verifier?police=...&jeton=...    (JSON)
+        POST /api/verifier  [{"police": ..., "jeton": ...}, ...]   (JSON, par lot)
+"""
+import argparse
+import base64
+import datetime
+import hashlib
+import hmac
+import html
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from cotation_history import apply_keyset
+
+PAGE_SIZE = 1000
+MAX_BATCH = 10_000
+MAX_BODY_BYTES = MAX_BATCH * 200     # ~60 octets par demande, avec une large marge
+TOKEN_BYTES = 10
+STATUT_CONTRACTUALISEE = "Contractualisée"
+
+
+# ============================
+# JETONS ET QR CODE
+# ============================
+def make_token(police_num, secret):
+    """Jeton de vérification : 16 caractères base32 (HMAC-SHA256 tronqué)."""
+    digest = hmac.new(secret.encode(), police_num.encode(), hashlib.sha256).digest()
+    return base64.b32encode(digest[:TOKEN_BYTES]).decode()
+
+
+def check_token(police_num, token, secret):
+    return hmac.compare_digest(make_token(police_num, secret), (token or "").strip().upper())
+
+
+def verification_payload(police_num, secret, base_url=None):
+    """Contenu du QR code : lien vers le service si son URL est connue, sinon texte brut."""
+    token = make_token(police_num, secret)
+    if base_url:
+        return f"{base_url.rstrip('/')}/verifier?{urlencode({'police': police_num, 'jeton': token})}"
+    return f"POLICE {police_num} JETON {token}"
+
+
+# ============================
+# INDEX EN MÉMOIRE
+# ============================
+class PoliceIndex:
+    """
+    police_num -> {police_num, cotation_id, echeance, statut_cotation,
+    montant, assure, beneficiaire, couverture}.
+
+    Chaque mise à jour remplace l'enregistrement entier : la lecture
+    (dict.get) se fait sans verrou.
+    """
+
+    def __init__(self, ttl_seconds=60):
+        self.ttl_seconds = ttl_seconds
+        self.ready = False
+        self._records = {}
+        self._by_cotation = {}      # cotation_id -> police_num
+        self._cursors = {"polices": None, "cotations": None}
+        self._last_refresh = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def get(self, police_num):
+        return self._records.get(police_num)
+
+    def add_police(self, row):
+        """Police (avec la cotation embarquée) ; une police modifiée remplace la précédente."""
+        cotation = row.get("cotations") or {}
+        record = {
+            "police_num": row["police_num"],
+            "cotation_id": row.get("cotation_id"),
+            "echeance": row.get("echeance"),
+            "statut_cotation": cotation.get("statut"),
+            "montant": cotation.get("montant_caution"),
+            "assure": cotation.get("assure"),
+            "beneficiaire": cotation.get("beneficiaire"),
+            "couverture": cotation.get("couverture"),
+        }
+        with self._lock:
+            self._records[record["police_num"]] = record
+            self._by_cotation[record["cotation_id"]] = record["police_num"]
+
+    def update_cotation(self, row):
+        """Statut ou montant modifié sur une cotation déjà contractualisée."""
+        with self._lock:
+            police_num = self._by_cotation.get(row.get("id"))
+            record = self._records.get(police_num)
+            if record is None:
+                return
+            self._records[police_num] = {
+                **record,
+                "statut_cotation": row.get("statut"),
+                "montant": row.get("montant_caution"),
+                "assure": row.get("assure"),
+                "beneficiaire": row.get("beneficiaire"),
+                "couverture": row.get("couverture"),
+            }
+
+    def _read(self, client, table, columns, apply):
+        while True:
+            query = client.table(table).select(columns)
+            query = apply_keyset(query, self._cursors[table], column="updated_at", desc=False)
+            rows = query.order('updated_at').order('id').limit(PAGE_SIZE).execute().data or []
+            for row in rows:
+                apply(row)
+            if rows:
+                self._cursors[table] = (rows[-1]["updated_at"], rows[-1]["id"])
+            if len(rows) < PAGE_SIZE:
+                break
+
+    def refresh(self, client):
+        """Lit les polices et cotations modifiées depuis le dernier passage (toutes au premier)."""
+        if not self.ready:
+            # Filigrane des cotations pris avant le chargement des polices (qui les
+            # embarquent) : les cotations antérieures ne sont jamais relues une à une
+            last = client.table('cotations').select('id, updated_at') \
+                         .order('updated_at', desc=True).order('id', desc=True) \
+                         .limit(1).execute().data
+            if last:
+                self._cursors["cotations"] = (last[0]["updated_at"], last[0]["id"])
+        self._read(client, 'polices',
+                   'id, updated_at, police_num, cotation_id, echeance, '
+                   'cotations(statut, montant_caution, assure, beneficiaire, couverture)',
+                   self.add_police)
+        self._read(client, 'cotations',
+                   'id, updated_at, statut, montant_caution, assure, beneficiaire, couverture',
+                   self.update_cotation)
+        self.ready = True
+        self._last_refresh = time.monotonic()
+
+    def maybe_refresh(self, client):
+        """Rafraîchit en arrière-plan si le TTL est écoulé."""
+        with self._lock:
+            if self._refreshing:
+                return
+            # Après un échec (chargement initial compris), nouvel essai au TTL suivant
+            if self._last_refresh and time.monotonic() - self._last_refresh < self.ttl_seconds:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(client)
+            except Exception:
+                self._last_refresh = time.monotonic()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="police-index", daemon=True).start()
+
+    def verify(self, police_num, token, secret, today=None):
+        """Réponse de vérification ; rien n'est divulgué sans jeton valide."""
+        police_num = (police_num or "").strip()
+        if not police_num or not check_token(police_num, token, secret):
+            return {"police_num": police_num, "valide": False, "motif": "Jeton invalide"}
+        record = self._records.get(police_num)
+        if record is None:
+            return {"police_num": police_num, "valide": False, "motif": "Police inconnue"}
+        today = (today or datetime.date.today()).isoformat()
+        echeance = record["echeance"]
+        if record["statut_cotation"] != STATUT_CONTRACTUALISEE:
+            statut = record["statut_cotation"] or "Inconnu"
+        elif echeance and echeance < today:
+            statut = "Échue"
+        else:
+            statut = "En vigueur"
+        return {
+            "police_num": police_num,
+            "valide": statut == "En vigueur",
+            "statut": statut,
+            "montant": record["montant"],
+            "echeance": echeance,
+            "assure": record["assure"],
+            "beneficiaire": record["beneficiaire"],
+            "couverture": record["couverture"],
+        }
+
+    def verify_many(self, demandes, secret, today=None):
+        today = today or datetime.date.today()
+        return [self.verify(d.get("police"), d.get("jeton"), secret, today) for d in demandes]
+
+
+# ============================
+# SERVICE HTTP (lecture seule)
+# ============================
+def _page(result):
+    from formatting import fmt_money, format_date_fr
+
+    if result.get("statut"):
+        lignes = [("Statut", result["statut"]),
+                  ("Assuré", result["assure"]),
+                  ("Bénéficiaire", result["beneficiaire"]),
+                  ("Couverture", result["couverture"]),
+                  ("Montant cautionné", fmt_money(result["montant"])),
+                  ("Échéance", format_date_fr(result["echeance"]) if result["echeance"] else "")]
+    else:
+        lignes = [("Statut", result["motif"])]
+    couleur = "#1b7f3b" if result["valide"] else "#b00020"
+    titre = "Caution authentique et en vigueur" if result["valide"] else "Caution non valide"
+    rows = "".join(f"<tr><th>{html.escape(k)}</th><td>{html.escape(str(v or ''))}</td></tr>"
+                   for k, v in lignes)
+    return (f"<!doctype html><html lang='fr'><meta charset='utf-8'>"
+            f"<meta name='viewport' content='width=device-width'>"
+            f"<title>Vérification police {html.escape(result['police_num'])}</title>"
+            f"<body style='font-family:sans-serif;max-width:32em;margin:2em auto'>"
+            f"<h2 style='color:{couleur}'>{titre}</h2>"
+            f"<p>Police n° {html.escape(result['police_num'])}</p>"
+            f"<table cellpadding='4'>{rows}</table></body></html>").encode()
+
+
+def make_handler(client, index, secret):
+
+    class VerificationHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            index.maybe_refresh(client)
+            if url.path == "/sante":
+                self._send_json({"polices": len(index), "pret": index.ready})
+                return
+            if url.path not in ("/verifier", "/api/verifier"):
+                self.send_error(404)
+                return
+            params = parse_qs(url.query)
+            result = index.verify(params.get("police", [""])[0], params.get("jeton", [""])[0], secret)
+            if url.path == "/verifier":
+                self._send(200, "text/html; charset=utf-8", _page(result))
+            else:
+                self._send_json(result)
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/api/verifier":
+                self.send_error(404)
+                return
+            index.maybe_refresh(client)
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.send_error(400, "Content-Length invalide")
+                return
+            if length > MAX_BODY_BYTES:
+                # Refusé avant lecture : le corps n'est jamais chargé en mémoire
+                self.send_error(413, f"Corps limité à {MAX_BODY_BYTES} octets")
+                self.close_connection = True
+                return
+            try:
+                demandes = json.loads(self.rfile.read(length))
+                if not isinstance(demandes, list) or len(demandes) > MAX_BATCH:
+                    raise ValueError
+                for d in demandes:
+                    if not isinstance(d, dict) or not all(isinstance(d.get(k, ""), str)
+                                                          for k in ("police", "jeton")):
+                        raise ValueError
+            except ValueError:
+                self.send_error(400, f"Liste JSON de {MAX_BATCH} demandes {{police, jeton}} au plus requise")
+                return
+            self._send_json(index.verify_many(demandes, secret))
+
+        def _send_json(self, payload):
+            self._send(200, "application/json; charset=utf-8",
+                       json.dumps(payload, ensure_ascii=False, default=str).encode())
+
+        def _send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+    return VerificationHandler
+
+
+def serve(client, secret, host="127.0.0.1", port=8503, ttl_seconds=60):
+    index = PoliceIndex(ttl_seconds)
+    index.refresh(client)
+    server = ThreadingHTTPServer((host, port), make_handler(client, index, secret))
+    print(f"{len(index)} polices indexées – vérification sur http://{host}:{port}/verifier")
+    server.serve_forever()
+
+
+def read_secret():
+    """Clé des jetons : variable d'environnement VERIFICATION_SECRET, à défaut secrets.toml."""
+    secret = os.environ.get("VERIFICATION_SECRET")
+    if not secret:
+        import streamlit as st
+        secret = st.secrets["VERIFICATION_SECRET"]
+    return secret
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Service de vérification des polices")
+    sub = parser.add_subparsers(dest="commande", required=True)
+    p = sub.add_parser("serve", help="Servir les vérifications (lecture seule)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8503)
+    p.add_argument("--ttl", type=int, default=60, help="Rafraîchissement de l'index (secondes)")
+    p = sub.add_parser("jeton", help="Afficher le jeton et le contenu du QR code d'une police")
+    p.add_argument("police_num")
+    p.add_argument("--url", help="URL publique du service")
+    args = parser.parse_args()
+
+    secret = read_secret()
+    if args.commande == "jeton":
+        print(make_token(args.police_num, secret))
+        print(verification_payload(args.police_num, secret, args.url))
+        return
+    from supabase_client import create_supabase_client
+    serve(create_supabase_client(), secret, args.host, args.port, args.ttl)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Capture et rejeu de la charge réelle (dimensionnement, comparaison de
+versions).
+
+Capture (optionnelle, WORKLOAD_CAPTURE_PATH) : chaque génération de
+cotation ou de contrat ajoute une ligne JSON horodatée au journal, avec
+les entrées des générateurs (data, lots_data, detail_agrement) et du
+tarif. Les textes identifiants (noms, adresses, marché, objet,
+désignations, police) sont masqués caractère par caractère : lettres en
+« x », chiffres en « 9 », ponctuation et espaces conservés. Les longueurs
+(donc la mise en page) et les montants restent ceux du trafic réel.
+
+Rejeu : les événements sont soumis à un pool de processus à leur
+cadence d'origine (accélérée par --vitesse, ou au plus vite avec
+--vitesse 0) et passent par le tarif et le générateur PDF concerné. Le
+rapport donne le débit et les percentiles de latence (attente comprise)
+par type de document ; enregistré en JSON, il se compare à celui d'une
+autre version sur le même journal.
+
+Usage :
+    python workload.py resume capture.jsonl
+    python workload.py rejouer capture.jsonl [--vitesse 10] [--workers 4] [-o rapport.json]
+    python workload.py comparer avant.json apres.json
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# Champs texte masqués (data et lots_data)
+MASKED_FIELDS = {
+    "assure", "souscripteur", "beneficiaire", "adresse", "adresse_beneficiaire",
+    "situation_geo", "num_marche", "autorite", "objet", "suretes_text",
+    "police_num", "qr_verification", "Désignation",
+}
+KINDS = ("cotation", "contrat", "agrement")
+PERCENTILES = (50, 90, 99)
+
+
+# ============================
+# CAPTURE
+# ============================
+def mask(text):
+    if not isinstance(text, str):
+        return text
+    return "".join("9" if c.isdigit() else ("x" if c.isalpha() else c) for c in text)
+
+
+def anonymize(record):
+    return {k: mask(v) if k in MASKED_FIELDS else v for k, v in record.items()}
+
+
+class WorkloadRecorder:
+    """Journal JSONL en ajout ; sans chemin, record() ne fait rien."""
+
+    def __init__(self, path=None, sample=1.0):
+        self.path = path
+        self.sample = sample
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def record(self, kind, data, lots_data=None, detail_agrement=None, tarif=None):
+        if not self.path or random.random() >= self.sample:
+            return
+        event = {
+            "ts": time.time(),
+            "kind": kind,
+            "data": anonymize(data),
+            "lots_data": [anonymize(lot) for lot in lots_data or []],
+            "detail_agrement": mask(detail_agrement),
+            "tarif": tarif,
+        }
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            # La capture ne doit jamais bloquer une génération
+            pass
+
+
+def load_events(path):
+    with open(path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    events.sort(key=lambda e: e["ts"])
+    return events
+
+
+def summarize(events):
+    if not events:
+        return {"evenements": 0}
+    lots = [len(e["lots_data"]) for e in events]
+    return {
+        "evenements": len(events),
+        "duree_s": events[-1]["ts"] - events[0]["ts"],
+        "documents": dict(Counter(e["kind"] for e in events)),
+        "couvertures": dict(Counter(e["data"].get("couverture") for e in events).most_common()),
+        "lots": {"max": max(lots), "moyenne": statistics.fmean(lots),
+                 "repartition": dict(sorted(Counter(lots).items()))},
+        "longueur_objet": {"max": max(len(e["data"].get("objet") or "") for e in events),
+                           "moyenne": statistics.fmean(len(e["data"].get("objet") or "") for e in events)},
+    }
+
+
+# ============================
+# REJEU
+# ============================
+def run_event(event, optimiser=False):
+    """Tarif puis rendu PDF (processus de travail) ; retourne (taille, durée de service)."""
+    from pdf_documents import generate_caution_pdf, generate_contrat_agrement_pdf, generate_contrat_pdf
+    from tarification import calculer_prime
+
+    t0 = time.perf_counter()
+    data = dict(event["data"])
+    tarif = event.get("tarif")
+    if tarif:
+        data.update(calculer_prime(data["montant_caution"], **tarif))
+    lots_data = event["lots_data"]
+    if event["kind"] == "cotation":
+        buffer = generate_caution_pdf(data, lots_data)
+    elif event["kind"] == "agrement":
+        buffer = generate_contrat_agrement_pdf(data, event.get("detail_agrement"), lots_data)
+    else:
+        buffer = generate_contrat_pdf(data, lots_data)
+    if optimiser:
+        from pdf_optimize import optimize_buffer
+        buffer = optimize_buffer(buffer)
+    return len(buffer.getvalue()), time.perf_counter() - t0
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    if len(values) == 1:
+        return {f"p{p}": values[0] for p in PERCENTILES}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {f"p{p}": cuts[p - 1] for p in PERCENTILES}
+
+
+def replay(events, speed=1.0, workers=None, optimiser=False, progress=None):
+    """
+    Soumet les événements à leur instant d'origine divisé par speed
+    (speed=0 : tous d'emblée). La latence va de l'instant prévu à la fin
+    du rendu : elle inclut l'attente si le pool est saturé.
+    """
+    if not events:
+        return {"evenements": 0}
+    origin = events[0]["ts"]
+    results = {kind: {"latence": [], "service": [], "octets": 0} for kind in KINDS}
+    done = [0]
+    lock = threading.Lock()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Processus démarrés et modules importés hors mesure
+        list(pool.map(run_event, events[:1] * (workers or os.cpu_count() or 1)))
+        t0 = time.perf_counter()
+
+        def finished(future, kind, due):
+            end = time.perf_counter()
+            size, service = future.result()
+            with lock:
+                results[kind]["latence"].append(end - due)
+                results[kind]["service"].append(service)
+                results[kind]["octets"] += size
+                done[0] += 1
+                if progress:
+                    progress(done[0], len(events))
+
+        futures = []
+        for event in events:
+            due = t0 + ((event["ts"] - origin) / speed if speed else 0.0)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            future = pool.submit(run_event, event, optimiser)
+            future.add_done_callback(lambda f, k=event["kind"], d=due: finished(f, k, d))
+            futures.append(future)
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - t0
+
+    report = {
+        "evenements": len(events),
+        "vitesse": speed,
+        "workers": workers or os.cpu_count(),
+        "duree_s": elapsed,
+        "debit_par_s": len(events) / elapsed,
+        "documents": {},
+    }
+    for kind, r in results.items():
+        if not r["latence"]:
+            continue
+        report["documents"][kind] = {
+            "nombre": len(r["latence"]),
+            "latence_s": percentiles(sorted(r["latence"])),
+            "service_s": percentiles(sorted(r["service"])),
+            "octets_moyens": r["octets"] / len(r["latence"]),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"{report['evenements']} événements en {report['duree_s']:.1f} s "
+          f"({report['debit_par_s']:.2f} documents/s, {report['workers']} processus, "
+          f"vitesse {report['vitesse'] or 'max'})")
+    print(f"{'Document':<10} {'Nombre':>7} " + " ".join(f"{'lat. p' + str(p):>10}" for p in PERCENTILES)
+          + f" {'service p50':>12} {'Ko moy.':>8}")
+    for kind, r in report["documents"].items():
+        print(f"{kind:<10} {r['nombre']:>7} "
+              + " ".join(f"{r['latence_s'][f'p{p}'] * 1000:>8.0f}ms" for p in PERCENTILES)
+              + f" {r['service_s']['p50'] * 1000:>10.0f}ms {r['octets_moyens'] / 1024:>8.0f}")
+
+
+def compare(before, after):
+    print(f"Débit : {before['debit_par_s']:.2f} -> {after['debit_par_s']:.2f} documents/s "
+          f"({(after['debit_par_s'] / before['debit_par_s'] - 1) * 100:+.0f} %)")
+    for kind in KINDS:
+        a, b = before["documents"].get(kind), after["documents"].get(kind)
+        if not a or not b:
+            continue
+        for p in PERCENTILES:
+            key = f"p{p}"
+            va, vb = a["latence_s"][key], b["latence_s"][key]
+            print(f"{kind:<10} latence {key:<4} {va * 1000:>8.0f} -> {vb * 1000:>8.0f} ms "
+                  f"({(vb / va - 1) * 100:+.0f} %)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture et rejeu de la charge de génération")
+    sub = parser.add_subparsers(dest="commande", required=True)
+    p = sub.add_parser("resume", help="Composition d'un journal de capture")
+    p.add_argument("journal")
+    p = sub.add_parser("rejouer", help="Rejouer un journal et mesurer débit et latences")
+    p.add_argument("journal")
+    p.add_argument("--vitesse", type=float, default=1.0, help="Accélération (0 : au plus vite)")
+    p.add_argument("--workers", type=int, default=None, help="Processus de rendu (défaut : cœurs)")
+    p.add_argument("--limite", type=int, default=None, help="Premiers événements seulement")
+    p.add_argument("--optimiser", action="store_true", help="Inclure l'optimisation pikepdf")
+    p.add_argument("-o", "--output", help="Rapport JSON")
+    p = sub.add_parser("comparer", help="Comparer deux rapports de rejeu")
+    p.add_argument("avant")
+    p.add_argument("apres")
+    args = parser.parse_args()
+
+    if args.commande == "resume":
+        print(json.dumps(summarize(load_events(args.journal)), ensure_ascii=False, indent=2))
+    elif args.commande == "rejouer":
+        events = load_events(args.journal)[:args.limite]
+        report = replay(events, args.vitesse, args.workers, args.optimiser,
+                        progress=lambda n, total: print(f"\r{n}/{total}", end="", flush=True))
+        print()
+        report["journal"] = os.path.basename(args.journal)
+        report["date"] = datetime.datetime.now().isoformat(timespec="seconds")
+        print_report(report)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        with open(args.avant, encoding="utf-8") as f:
+            before = json.load(f)
+        with open(args.apres, encoding="utf-8") as f:
+            after = json.load(f)
+        compare(before, after)
+
+
+if __name__ == "__main__":
+    main()